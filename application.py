@@ -11,7 +11,7 @@ Application class to store properties of the application being created
 import os, sys, random, re, logging, time
 import wx
 
-import common, config, misc, plugins, compat
+import common, config, decorators, misc, plugins, compat
 import bugdialog
 import new_properties as np
 
@@ -123,15 +123,16 @@ class EditRoot(np.PropertyOwner):
         attrs["source_extension"] = '.' + self.properties["source_extension"].get_string_value()
         attrs["header_extension"] = '.' + self.properties["header_extension"].get_string_value()
 
-        inner_xml = []
+        # write the children directly to output; there's no need to collect them in a list first
+        output.append( common.format_xml_start_tag(u'application', **attrs) )
 
         if self.is_template and getattr(self, 'template_data', None):
-            self.template_data.write(inner_xml, tabs+1)
+            self.template_data.write(output, tabs+1)
 
         for c in self.children:
-            c.write(inner_xml, tabs+1)
+            c.write(output, tabs+1)
 
-        output.extend( common.format_xml_tag( u'application', inner_xml, is_xml=True, **attrs ) )
+        output.append( common.format_xml_end_tag(u'application') )
 
     def find_widget_from_path(self, path):
         path = path.split("/")
@@ -411,6 +412,9 @@ class Application(EditRoot):
         # XXX any other to be handled?
         if not modified or "language" in modified:
             self._set_language() # update language-dependent choices
+        if modified and "for_version" in modified:
+            # entries for the previous version are not needed any more
+            decorators.clear_caches()
         if not modified or "name" in modified or "class" in modified:
             # enable/disable top_window
             self.properties["top_window"].set_active(self.name or self.klass)
@@ -518,7 +522,7 @@ class Application(EditRoot):
         finally:
             writer.clean_up(widget or self)
 
-        if preview or not config.use_gui: return
+        if preview or not config.use_gui: return True
         if config.preferences.show_completion:
             # Show informational dialog
             misc.info_message("Code generation completed successfully")
@@ -527,6 +531,7 @@ class Application(EditRoot):
             app = wx.GetApp()
             frame = app.GetTopWindow()
             frame.user_message(_('Code generated'))
+        return True
 
     def is_visible(self):
         return True
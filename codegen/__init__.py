@@ -6,9 +6,9 @@
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import copy, logging, os, os.path, random, re, sys, time
+import copy, json, logging, os, os.path, random, re, sys, time
 
-import common, config, compat, misc
+import common, config, compat, misc, profiling
 import wcodegen
 from collections import OrderedDict
 
@@ -41,6 +41,58 @@ def _replace_tag(lst, tag, content):
         ret = True
 
 
+class _TaggedLines(object):
+    """Lines of an existing source file with placeholder tags; see BaseSourceFileContent.replace().
+
+    The positions of the tags are indexed once; the replacements are collected and applied in a single pass by
+    get_lines(), instead of searching and splicing the list for each tag as _replace_tag() does."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.index = None   # tag line -> list of positions
+        self.pending = {}   # position -> list of replacement lines
+
+    def replace(self, tag, content):
+        "Replace all occurrences of the placeholder tag with content; returns False if the tag was not found"
+        if self.index is None:
+            self.index = index = {}
+            for i, line in enumerate(self.lines):
+                if line.startswith("<"):
+                    index.setdefault(line, []).append(i)
+        add_line = False
+        if not tag in self.index and not tag.endswith("\n"):
+            tag = tag + "\n"
+            add_line = True
+        positions = self.index.pop(tag, None)
+        if not positions:
+            return False
+        if isinstance(content, list):
+            lines = add_line and content + ["\n"] or content
+        elif isinstance(content, compat.basestring):
+            lines = [add_line and content + "\n" or content]
+        else:
+            raise ValueError("Internal error")
+        for i in positions:
+            self.pending[i] = lines
+        return True
+
+    def get_lines(self):
+        "Apply the pending replacements and return the list of lines, which may be modified by the caller"
+        if self.pending:
+            out = []
+            start = 0
+            for i in sorted(self.pending):
+                out.extend(self.lines[start:i])
+                out.extend(self.pending[i])
+                start = i + 1
+            out.extend(self.lines[start:])
+            self.lines = out
+            self.pending = {}
+        # the caller may modify the list
+        self.index = None
+        return self.lines
+
+
 class BaseSourceFileContent(object):
     """Keeps info about an existing file that has to be updated, to replace only
     the lines inside a wxGlade block, an to keep the rest of the file as it was
@@ -49,7 +101,9 @@ class BaseSourceFileContent(object):
      rec_block_start:   Regexp to match the begin of a wxglade block
      rec_block_end:     Regexp to match the end of a wxGlade block
      rec_class_decl:    Regexp to match class declarations
-     rec_event_handler: Regexp to match event handlers"""
+     rec_event_handler: Regexp to match event handlers
+     rec_relevant:      Regexp to find the lines that may be matched by one of the above or change the state of the
+                        parser, e.g. by starting or ending a comment; all other lines are just copied or skipped"""
 
     def __init__(self, name, code_writer):
         self.OK = False
@@ -77,8 +131,17 @@ class BaseSourceFileContent(object):
             # this will be checked in writer.init_files and returned via writer.new_project to application.generate_code
             pass
 
+    def _get_content(self):
+        return self._content.get_lines() if self._content is not None else None
+
+    def _set_content(self, lines):
+        self._content = _TaggedLines(lines) if lines is not None else None
+
+    # the content with the replacements applied; set by build_untouched_content()
+    content = property(_get_content, _set_content)
+
     def replace(self, tag, content):
-        return _replace_tag(self.content, tag, content)
+        return self._content.replace(tag, content)
 
     def build_untouched_content(self):
         """Builds a string with the contents of the file that must be left as is, and replaces the wxGlade blocks
@@ -105,7 +168,8 @@ class BaseSourceFileContent(object):
     def _load_file(self, filename):
         "Load a file and return the content. The read source file will be decoded to unicode automatically."
         # Separated for debugging purposes
-        lines = common._read_file(filename)
+        # checksum and line ending are kept for the writer's save_file(), so the file needs to be read only once
+        lines, self.code_writer._source_file_info[filename] = common._read_file_info(filename)
 
         encoding = self.code_writer.app_encoding
         if encoding:
@@ -128,6 +192,87 @@ class ClassLines(object):
         self.final = []  # to be inserted after children, e.g. Add or AddPage for sizers / notebooks
 
 
+class CodegenCache(object):
+    """Persistent cache for incremental code generation in "Separate file for each class" mode.
+
+    For each toplevel class, a checksum of the XML of the toplevel window and the writer settings is stored together
+    with modification time and size of the files that were written for this class.
+    If the checksum is unchanged and the files were not modified in between, the class does not need to be
+    generated again.
+
+    The cache files are stored in config.appdata_path; one file per project file, language and output directory."""
+
+    def __init__(self, filename, settings):
+        self.filename = filename  # file name of the cache file
+        self.settings = settings  # checksum of the writer settings
+        self.entries = {}         # class name -> {"key":..., "files": {filename: [mtime, size]}}
+        self.changed = False
+
+    @classmethod
+    def for_project(cls, app, writer):
+        "Create a cache for the given project and writer and load the entries from the last run"
+        name = "%s|%s|%s" % (app.filename, writer.language, writer.out_dir)
+        filename = os.path.join( config.appdata_path, 'codegen_cache',
+                                 common.md5(name.encode('utf-8')).hexdigest() + '.json' )
+        settings = [config.version, writer.language, writer.for_version, writer.app_encoding, writer.indent_symbol,
+                    writer.indent_amount, writer.out_dir, writer._overwrite, writer._mark_blocks, writer._use_gettext,
+                    writer._textdomain, writer.is_template, app.source_extension, app.header_extension,
+                    config.preferences.write_timestamp, config.preferences.write_generated_from]
+        cache = cls( filename, common.md5(repr(settings).encode('utf-8')).hexdigest() )
+        cache.load()
+        return cache
+
+    def load(self):
+        if not os.path.isfile(self.filename): return
+        try:
+            with open(self.filename, 'r') as infile:
+                data = json.load(infile)
+        except (EnvironmentError, ValueError):
+            logging.info( _('Ignoring invalid code generation cache "%s"'), self.filename )
+            return
+        if data.get("settings")==self.settings:
+            self.entries = data.get("entries", {})
+
+    def save(self):
+        if not self.changed: return
+        dirname = os.path.dirname(self.filename)
+        try:
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            with open(self.filename, 'w') as outfile:
+                json.dump( {"settings":self.settings, "entries":self.entries}, outfile )
+        except EnvironmentError:
+            # not an error, the code will just be generated again next time
+            logging.info( _('Can not write code generation cache "%s"'), self.filename )
+        self.changed = False
+
+    def get_key(self, obj):
+        "Checksum of the XML of the toplevel obj"
+        lines = []
+        obj.write(lines, 1)  # same indentation as in Application.write(), so the XML cached by obj is re-used
+        return common.md5( u"".join(lines).encode('utf-8') ).hexdigest()
+
+    def _stat(self, filename):
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+        return [st.st_mtime, st.st_size]
+
+    def is_unchanged(self, klass, key):
+        "True if the files for klass were generated with the same key and were not modified since"
+        entry = self.entries.get(klass)
+        if not entry or entry["key"]!=key or not entry["files"]: return False
+        for filename, stat in entry["files"].items():
+            if self._stat(filename)!=stat: return False
+        return True
+
+    def update(self, klass, key, filenames):
+        files = dict( (filename, self._stat(filename)) for filename in filenames )
+        self.entries[klass] = {"key":key, "files":files}
+        self.changed = True
+
+
 class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
     """Dictionary of objects used to generate the code in a given language.
 
@@ -272,6 +417,14 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
 
     _show_warnings = True  # Enable or disable printing of warning messages; see self.warning()
 
+    # unchanged toplevel classes will be skipped in multiple files mode; see CodegenCache;
+    # this must be disabled for languages where the code of a class depends on the code of the previous classes
+    supports_incremental_codegen = True
+
+    # widget writer methods to count and measure if profiling.codegen is enabled; see generate_code()
+    profiled_methods = ("get_code", "get_code_per_child", "get_event_handlers", "get_properties_code",
+                        "get_layout_code", "cn_f")
+
     def __init__(self):
         "Initialise only instance variables using there defaults"
         wcodegen.BaseCodeWriter.__init__(self)
@@ -307,6 +460,9 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
         self.previous_source = None
         self._app_added = False
         self._current_extra_code = []
+        self._generated_files = None  # if not None, the names of the files written by save_file() are collected here
+        self._source_file_info = {}   # file name -> common._FileInfo of existing files read by SourceFileContent
+        self._file_saver = None       # common.FileSaver if files are written in background threads; see save_file()
         self._overwrite = config.default_overwrite
         self._mark_blocks = True # YYY config.mark_blocks
         self._textdomain = 'app'
@@ -447,16 +603,77 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
         if IS_CLASS:
             self.finalize_class(obj)
 
+    def _get_codegen_cache(self, root, widget):
+        "Returns a CodegenCache instance if unchanged classes may be skipped; see generate_code()"
+        if widget is not None or self.preview or not self.multiple_files or not root.IS_ROOT: return None
+        if not self.supports_incremental_codegen or not config.appdata_path: return None
+        if not config.preferences or not config.preferences.incremental_codegen: return None
+        return CodegenCache.for_project(root, self)
+
     def generate_code(self, root, widget=None):
         "entry point for recursive code generation via _generate_code()"
+        if not profiling.codegen.enabled:
+            self._generate_code_root(root, widget)
+            return
+
+        # count calls and wall time of the widget code writers
+        instrumented = [(builder, profiling.instrument(profiling.codegen, builder, self.profiled_methods,
+                                                       self.language, klass))
+                        for klass, builder in sorted(self.obj_builders.items())]
+        try:
+            with profiling.codegen.measure(self.language, "", "generate_code"):
+                self._generate_code_root(root, widget)
+        finally:
+            for builder, method_names in instrumented:
+                profiling.uninstrument(builder, method_names)
+
+    def _get_file_saver(self, widget):
+        "Returns a common.FileSaver if the files of multiple files mode may be written in parallel; see save_file()"
+        if widget is not None or self.preview or not self.multiple_files: return None
+        threads = config.preferences.codegen_threads if config.preferences else 0
+        if threads < 2: return None
+        return common.FileSaver(threads)
+
+    def _generate_code_root(self, root, widget):
         # root must be application.Application instance for now
-        for c in root.children or []:
-            if widget is not None and c is not widget: continue # for preview
-            self._generate_code(None, None, None, c)
-        if not root.IS_ROOT: return
-        topwin = [c for c in root.children if c.name==root.top_window]
-        topwin = topwin and topwin[0] or root.children and root.children[0] or None
-        self.add_app(root, topwin)
+        cache = self._get_codegen_cache(root, widget)
+        updates = []  # (klass, key, files) for the cache; to be stored after the files are written
+        self._file_saver = self._get_file_saver(widget)
+        try:
+            for c in root.children or []:
+                if widget is not None and c is not widget: continue # for preview
+                if cache is None:
+                    self._generate_code(None, None, None, c)
+                    continue
+                key = cache.get_key(c)
+                if cache.is_unchanged(c.klass, key):
+                    logging.info('Skipped unchanged class %s', c.klass)
+                    continue
+                self._generated_files = []
+                try:
+                    self._generate_code(None, None, None, c)
+                    updates.append( (c.klass, key, self._generated_files) )
+                finally:
+                    self._generated_files = None
+            if root.IS_ROOT:
+                topwin = [c for c in root.children if c.name==root.top_window]
+                topwin = topwin and topwin[0] or root.children and root.children[0] or None
+                self.add_app(root, topwin)
+            if self._file_saver is not None:
+                try:
+                    self._file_saver.wait()
+                finally:
+                    # the worker threads must not modify config.backed_up
+                    for filename, backed_up in self._file_saver.results:
+                        if backed_up: config.backed_up[filename] = True
+        finally:
+            if self._file_saver is not None:
+                self._file_saver.cancel()
+                self._file_saver = None
+        if cache is not None:
+            for klass, key, files in updates:
+                cache.update(klass, key, files)
+            cache.save()
 
     def finalize(self):
         "Code generator finalization function"
@@ -1013,6 +1230,7 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
 
         A shebang is added in top of all mainfiles. The permissions of mainfiles will be set to 0755 too.
         common.save_file() is used for storing content, i.e. the file will only be written in case of changes.
+        In multiple files mode, this is done in worker threads; errors are raised at the end of generate_code().
 
         filename:     File name
         content:      File content as list of strings
@@ -1063,9 +1281,26 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
             except:
                 logging.exception( _('Can not create output directory "%s"'), dirname )
 
-        # save the file now
+        # save the file now or, in multiple files mode, queue it for the worker threads
+        if self._generated_files is not None:
+            self._generated_files.append(filename)
+        info = self._source_file_info.pop(filename, None)
+        # the preferences are read here, as _save_file() may run in a worker thread
+        atomic = bool(config.preferences and config.preferences.codegen_atomic_write)
+        backup = common.get_backup_suffix(filename, 'codegen')
+        durability = config.preferences.save_durability
+        if self._file_saver is not None:
+            self._file_saver.submit( filename, self._save_file,
+                                     filename, tmp, info, mainfile, atomic, backup, durability )
+        elif self._save_file(filename, tmp, info, mainfile, atomic, backup, durability):
+            config.backed_up[filename] = True
+
+    def _save_file(self, filename, lines, info, mainfile, atomic, backup, durability):
+        # write the encoded lines; may be called from a worker thread of common.FileSaver
+        # returns True if a backup copy has been created; the caller has to update config.backed_up
+        backed_up = False
         try:
-            common.save_file(filename, tmp, 'codegen')
+            backed_up = common.save_file(filename, lines, 'codegen', info, atomic, backup, durability)
         except (UnicodeEncodeError, EnvironmentError):
             # these will be handled inside application.generate_code
             raise
@@ -1081,6 +1316,7 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
                 self.warning(_('Changing permission of file "%s" failed: %s') % (filename, str(e)))
 
         logging.info('Generated %s', filename)
+        return backed_up
 
     def store_as_attr(self, obj):
         """Returns True if 'obj' should be added as an attribute of its parent's class,
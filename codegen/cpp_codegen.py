@@ -10,7 +10,7 @@ C++ code generator
 
 import os.path, re, logging
 
-from codegen import BaseLangCodeWriter, BaseSourceFileContent, _replace_tag
+from codegen import BaseLangCodeWriter, BaseSourceFileContent, _replace_tag, _TaggedLines
 from codegen import ClassLines as BaseClassLines
 import config, wcodegen
 
@@ -91,6 +91,8 @@ class SourceFileContent(BaseSourceFileContent):
         )
     "Regexp to match wxGlade comment of event handlers"
 
+    rec_relevant = re.compile( r'class|wxGlade|/\*|\*/|DECLARE_EVENT_TABLE|BEGIN_EVENT_TABLE' )
+
     def __init__(self, name, code_writer):
 
         # initialise new variables first
@@ -105,8 +107,16 @@ class SourceFileContent(BaseSourceFileContent):
         # call inherited constructor
         BaseSourceFileContent.__init__(self, name, code_writer)
 
+    def _get_header_content(self):
+        return self._header_content.get_lines() if self._header_content is not None else None
+
+    def _set_header_content(self, lines):
+        self._header_content = _TaggedLines(lines) if lines is not None else None
+
+    header_content = property(_get_header_content, _set_header_content)
+
     def replace_header(self, tag, content):
-        return _replace_tag(self.header_content, tag, content)
+        return self._header_content.replace(tag, content)
 
     def build_untouched_content(self):
         BaseSourceFileContent.build_untouched_content(self)
@@ -124,6 +134,10 @@ class SourceFileContent(BaseSourceFileContent):
         out_lines = []
         check_old_methods = []  # list of indices with set_properties or do_layout
         for line in tmp_in:
+            if not prev_was_handler and not self.rec_relevant.search(line):
+                # neither class declaration, wxGlade marker, event table nor comment: keep the line unless inside a block
+                if not inside_block: out_lines.append(line)
+                continue
             comment_index = line.find('/*')
             if not inside_comment and comment_index != -1 and comment_index > line.find('//'):
                 inside_comment = True
@@ -50,6 +50,8 @@ class SourceFileContent(BaseSourceFileContent):
         r'\s*$'                                              # tailing spaces
         )
 
+    rec_relevant = re.compile( r'defclass|wxGlade|"""|\'\'\'|# end of class ' )
+
     def build_untouched_content(self):
         BaseSourceFileContent.build_untouched_content(self)
         inside_block = False
@@ -59,6 +61,10 @@ class SourceFileContent(BaseSourceFileContent):
         out_lines = []
         check_old_methods = []  # list of indices with set_properties or do_layout
         for line in tmp_in:
+            if not self.rec_relevant.search(line):
+                # neither class declaration, wxGlade marker nor triple quote: keep the line unless inside a block
+                if not inside_block: out_lines.append(line)
+                continue
             quote_index = -1
             if not inside_triple_quote:
                 triple_dquote_index = line.find('"""')
@@ -166,6 +172,9 @@ class LispCodeWriter(BaseLangCodeWriter, wcodegen.LispMixin):
 
     shebang = '#!/usr/bin/env lisp\n;;;\n'
 
+    # the project wide dependencies are collected while generating all classes
+    supports_incremental_codegen = False
+
     SourceFileContent = SourceFileContent
 
     tmpl_sizeritem = '(wxSizer_AddWindow (%s obj) (%s obj) %s %s %s nil)\n'  # will be overwritten and restored
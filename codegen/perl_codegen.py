@@ -55,6 +55,8 @@ class SourceFileContent(BaseSourceFileContent):
         r'.*$'                                  # any character till eol
         )
 
+    rec_relevant = re.compile( r'^\s*=|package|wxGlade|# end of class ' )
+
 
     def build_untouched_content(self):
         """\
@@ -75,6 +77,10 @@ class SourceFileContent(BaseSourceFileContent):
         out_lines = []
         check_old_methods = []  # list of indices with set_properties or do_layout
         for line in tmp_in:
+            if not inside_pod and not self.rec_relevant.search(line):
+                # neither POD, package declaration nor wxGlade marker: keep the line unless inside a block
+                if not inside_block: out_lines.append(line)
+                continue
             result = self.rec_pod.match(line)
             if result:
                 inside_pod = True
@@ -45,6 +45,8 @@ class SourceFileContent(BaseSourceFileContent):
         r'#\s*wxGlade:\s*(?P<class>\w+)\.<event_handler>'  # wxGlade event handler statement with class name
         r'\s*$' )                                          # trailing spaces
 
+    rec_relevant = re.compile( r'^class|wxGlade|"""|\'\'\'|# end of class ' )
+
     def build_untouched_content(self):
         BaseSourceFileContent.build_untouched_content(self)
         inside_block = False
@@ -56,6 +58,10 @@ class SourceFileContent(BaseSourceFileContent):
         for line in tmp_in:
             if line.endswith("\r\n"):  # normalize line ending for files on Windows
                 line = "%s\n"%line[:-2]
+            if not self.rec_relevant.search(line):
+                # neither class declaration, wxGlade marker nor triple quote: keep the line unless inside a block
+                if not inside_block: out_lines.append(line)
+                continue
             quote_index = -1
             if not inside_triple_quote:
                 triple_dquote_index = line.find('"""')
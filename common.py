@@ -18,10 +18,10 @@ except:
     from hashlib import md5
 from collections import OrderedDict
 
-import logging, os, os.path, sys, tempfile
+import logging, os, os.path, shutil, sys, tempfile, threading
 from xml.sax.saxutils import escape, quoteattr
 
-import config, compat, plugins, misc
+import config, compat, plugins, misc, profiling
 
 
 widget_classes = {}   # EditWidget class name -> EditWidget class
@@ -68,10 +68,14 @@ def init_codegen():
     see: load_config() load_code_writers(), load_widgets(), load_sizers()"""
     # process generic related style attributes
     style_attrs_to_sets(config.widget_config['generic_styles'])
-    load_config()
-    load_code_writers()
-    all_widgets = load_widgets()
-    sizer_buttons = load_sizers()
+    with profiling.startup.measure("common.load_config"):
+        load_config()
+    with profiling.startup.measure("common.load_code_writers"):
+        load_code_writers()
+    with profiling.startup.measure("common.load_widgets"):
+        all_widgets = load_widgets()
+    with profiling.startup.measure("common.load_sizers"):
+        sizer_buttons = load_sizers()
 
     # initialize preview code generator
     preview_codegen = code_writers["preview"] = code_writers["python"].copy()
@@ -120,6 +124,11 @@ def load_code_writers():
 
 def load_config():
     "Load widget configuration;  see: plugins.load_widgets_from_dir()"
+    if not config.use_gui and not config.testing:
+        # batch mode: load widget modules only when they are referenced by a .wxg file
+        plugins.register_lazy_widgets( config.widgets_path )
+        plugins.register_lazy_widgets( config.preferences.local_widget_path )
+
     # load the "built-in" and "user" widgets
     plugins.load_widgets_from_dir( config.widgets_path,                  'wconfig' )
     plugins.load_widgets_from_dir( config.preferences.local_widget_path, 'wconfig' )
@@ -309,6 +318,38 @@ def register(lang, klass_name, code_writer):
 ########################################################################################################################
 # file utilities
 
+class _SmartChecksum(object):
+    """Incremental calculation of a "smart" checksum; see _smart_checksum().
+    The content may be passed in chunks of any size; the checksum is calculated line by line."""
+    def __init__(self):
+        self._chksum = md5()  # use md5 to be compatible with Python 2.4
+        self._lineno = 0
+        self._pending = b""   # incomplete last line
+
+    def update(self, data):
+        if isinstance(data, compat.unicode):
+            data = data.encode('utf-8')
+        if not b"\n" in data:
+            self._pending += data
+            return
+        lines = data.split(b"\n")
+        lines[0] = self._pending + lines[0]
+        self._pending = lines.pop()
+        for line in lines:
+            self._add_line(line)
+
+    def _add_line(self, line):
+        if self._lineno>=10 or not b'generated by wxGlade' in line:
+            self._chksum.update(line.rstrip())
+        self._lineno += 1
+
+    def hexdigest(self):
+        if self._pending:
+            self._add_line(self._pending)
+            self._pending = b""
+        return self._chksum.hexdigest()
+
+
 def _smart_checksum(content):
     """Generate a "smart" checksum of the given content. The version line "generated by wxGlade" as well as tailing
     whitespaces will ignored during generation of the checksum. Returns a strings.
@@ -316,14 +357,9 @@ def _smart_checksum(content):
     The version line will be ignored within the first ten lines only.
 
     content: Content to generate a checksum for; list of bytes"""
-    chksum = md5()  # use md5 to be compatible with Python 2.4
-
-    for i,line in enumerate(content):
-        if isinstance(line, compat.unicode):
-            line = line.encode('utf-8')
-        if b'generated by wxGlade' in line and i<10: continue
-        chksum.update(line.rstrip())
-
+    chksum = _SmartChecksum()
+    for line in content:
+        chksum.update(line)
     return chksum.hexdigest()
 
 
@@ -336,67 +372,329 @@ def _read_file(filename):
             yield line
 
 
-def save_file(filename, content, which='wxg'):
+class _FileInfo(object):
+    """Checksum and line ending of an existing file, recorded while reading it; see _read_file_info(), save_file().
+    The information is valid as long as modification time and size of the file are unchanged."""
+    def __init__(self, filename):
+        self.filename = filename
+        self._stat = self._get_stat()
+        self.checksum = None
+        self.win_line_ending = False
+
+    def _get_stat(self):
+        try:
+            st = os.stat(self.filename)
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def is_current(self):
+        return self._stat is not None and self._stat == self._get_stat()
+
+
+def _read_file_info(filename):
+    """Read file into a list of lines (bytes) like _read_file() and record checksum and line ending.
+    Returns (lines, _FileInfo); the _FileInfo may be passed to save_file() to avoid reading the file again."""
+    info = _FileInfo(filename)
+    lines = []
+    chksum = _SmartChecksum()
+    with open(filename, "rb") as f:
+        for i, line in enumerate(f.readlines()):
+            if line.endswith(b"\r\n"):
+                if not i: info.win_line_ending = True
+                line = line[:-2]+b"\n"
+            chksum.update(line)
+            lines.append(line)
+    info.checksum = chksum.hexdigest()
+    return lines, info
+
+
+def _backup_file(filename, suffix, keep=False, copy=False):
+    """Rename filename to the backup file name filename+suffix; see save_file()
+    With keep=True, filename stays in place and the backup is created as hard link or, if not possible, as copy.
+    With keep=True and copy=True, the backup is always a copy, e.g. as filename will be overwritten in place.
+    The caller has to add filename to config.backed_up; this is not done here, as files may be saved in threads."""
+    backup_name = filename + suffix
+    if os.path.isfile(backup_name):
+        os.remove(backup_name)
+    if not keep:
+        os.rename(filename, backup_name)
+        return
+    if not copy and hasattr(os, "link"):  # no os.link on Windows with Python 2
+        try:
+            os.link(filename, backup_name)
+            return
+        except EnvironmentError:
+            pass  # not supported by the file system
+    shutil.copy2(filename, backup_name)
+
+
+def _replace_file(src, dst):
+    "Rename src to dst, even if dst exists"
+    if hasattr(os, "replace"):
+        os.replace(src, dst)  # Python 3
+    else:
+        if os.name=="nt" and os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def _get_umask():
+    "Return the umask of the process; os.umask() can only read it by setting it, so don't call this from threads"
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+_umask = _get_umask()  # read once on import, i.e. on the main thread; files are saved from worker threads as well
+
+
+def _copy_mode(filename, tmp_name):
+    "Set the permissions of the temporary file tmp_name to those of filename or, for new files, to the default ones"
+    if os.path.isfile(filename):
+        shutil.copymode(filename, tmp_name)
+    else:
+        # mkstemp creates files that are readable by the user only
+        os.chmod(tmp_name, 0o666 & ~_umask)
+
+
+def _can_replace(filename, tmp_name):
+    """Returns False if the temporary file tmp_name can't replace filename without losing hard links, owner, group or
+    access control lists of filename; see _commit_temp_file(). The owner and group are copied to tmp_name, if needed."""
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return True  # a new file
+    if st.st_nlink > 1:
+        return False
+    if hasattr(os, "listxattr"):  # Python 3 on Linux
+        try:
+            if any(name.startswith("system.posix_acl_") for name in os.listxattr(filename)):
+                return False
+        except EnvironmentError:
+            pass  # not supported by the file system
+    if not hasattr(os, "chown"):
+        return True  # Windows
+    tmp_st = os.stat(tmp_name)
+    if (tmp_st.st_uid, tmp_st.st_gid) != (st.st_uid, st.st_gid):
+        try:
+            os.chown(tmp_name, st.st_uid, st.st_gid)
+        except EnvironmentError:
+            return False
+    return True
+
+
+def _overwrite_file(tmp_name, filename, durability=None):
+    "Copy the content of the temporary file tmp_name into the existing file filename and remove tmp_name"
+    with open(tmp_name, 'rb') as infile:
+        with open(filename, 'wb') as outfile:
+            shutil.copyfileobj(infile, outfile)
+            _sync_file(outfile, durability)
+    os.remove(tmp_name)
+
+
+def _create_temp_file(filename):
+    "Create an empty temporary file in the directory of filename and return its name; see _commit_temp_file()"
+    directory = os.path.dirname(filename)
+    fd, tmp_name = tempfile.mkstemp( prefix=os.path.basename(filename)+".", suffix=".tmp", dir=directory or None )
+    os.close(fd)
+    return tmp_name
+
+
+def _sync_file(outfile, durability=None):
+    "Flush the content of the open file outfile to the disk, if the durability level is at least 1"
+    if durability is None:
+        durability = config.preferences.save_durability
+    if durability < 1: return
+    outfile.flush()
+    os.fsync( outfile.fileno() )
+
+
+def _sync_directory(directory, durability=None):
+    "Flush the directory entries to the disk, if the durability level is at least 2; not supported on Windows"
+    if durability is None:
+        durability = config.preferences.save_durability
+    if durability < 2 or os.name=="nt": return
+    try:
+        fd = os.open(directory or os.curdir, os.O_RDONLY)
+    except EnvironmentError:
+        return
+    try:
+        os.fsync(fd)
+    except EnvironmentError:
+        pass  # e.g. not supported by the file system
+    finally:
+        os.close(fd)
+
+
+def _commit_temp_file(tmp_name, filename, backup, durability=None):
+    """Rename the completely written temporary file tmp_name to filename.
+    Permissions are copied from an existing file and a backup copy is created if a backup suffix is given.
+    Other processes will either see the old or the new content, but never a partially written or a missing file.
+
+    filename must not be a symbolic link; see _write_file_atomic(). If the file can't be replaced without losing hard
+    links, owner or access control lists, the content is written into the existing file instead; see _can_replace()"""
+    replace = _can_replace(filename, tmp_name)
+    if backup:
+        _backup_file(filename, backup, keep=True, copy=not replace)  # filename must exist until it's replaced
+    if not replace:
+        _overwrite_file(tmp_name, filename, durability)
+        return
+    _copy_mode(filename, tmp_name)
+    _replace_file(tmp_name, filename)
+    _sync_directory(os.path.dirname(filename), durability)
+
+
+def _remove_temp_file(tmp_name):
+    "Remove a temporary file that was not committed, e.g. after an error"
+    if tmp_name and os.path.exists(tmp_name):
+        os.remove(tmp_name)
+
+
+def _write_file_atomic(filename, content, backup, durability=None):
+    """Write content to a temporary file in the same directory and rename this to filename.
+    Depending on the durability level, the content is flushed to the disk before; see Preferences.save_durability
+    If filename is a symbolic link, the file it points to is replaced."""
+    filename = os.path.realpath(filename)  # keep the link; the temporary file is created next to the target
+    tmp_name = _create_temp_file(filename)
+    try:
+        with open(tmp_name, 'wb') as outfile:
+            for line in content:
+                outfile.write(line)
+            _sync_file(outfile, durability)
+        _commit_temp_file(tmp_name, filename, backup, durability)
+        tmp_name = None
+    finally:
+        _remove_temp_file(tmp_name)
+
+
+def save_file(filename, content, which='wxg', info=None, atomic=True, backup=None, durability=None):
     """Save content to named file and, if user's preferences say so and filename exists, makes a backup copy of it.
 
     The content of 'wxg' files must be Unicode always!
     Exceptions that may occur while performing the operations are not handled.
+    From worker threads, call this with explicit backup and durability, as the preferences must not be accessed there;
+    the caller has to update config.backed_up then.
 
     see: config.backed_up
 
-    filename: Name of the file to create
-    content:  list of strings to store into 'filename'
-    which:    Kind of backup: 'wxg' or 'codegen'"""
+    filename:   Name of the file to create
+    content:    list of strings to store into 'filename'
+    which:      Kind of backup: 'wxg' or 'codegen'
+    info:       _FileInfo of the existing file as returned by _read_file_info(); used if still current
+    atomic:     write to a temporary file first and rename this to filename; see _write_file_atomic()
+    backup:     suffix of the backup copy or "" for none; default: see get_backup_suffix()
+    durability: see Preferences.save_durability; default: from the preferences
+
+    Returns True if a backup copy has been created."""
     if which == 'wxg':
         content = [line.encode('utf-8') for line in content] # encode from unicode to utf-8
-        do_backup = config.preferences.wxg_backup
-    elif which == 'codegen':
-        do_backup = config.preferences.codegen_backup
-    else:
+    elif which != 'codegen':
         raise NotImplementedError( 'Unknown value "%s" for parameter "which"!' % which )
+    update_backed_up = backup is None
+    if backup is None:
+        backup = get_backup_suffix(filename, which)
+    if durability is None:
+        durability = config.preferences.save_durability
+
+    if info is not None and not info.is_current():
+        info = None
 
     if os.path.isfile(filename):
-        # read existing file to check content
-        chksum_oldcontent = _smart_checksum( _read_file(filename) )
+        # read existing file to check content and line ending, if not done before
+        if info is None:
+            info = _read_file_info(filename)[1]
 
         # nothing changed?
         chksum_content = _smart_checksum(content)
-        if chksum_oldcontent == chksum_content:
-            return
-
-    # create the backup file only with the first save
-    need_backup = do_backup and filename not in config.backed_up and os.path.isfile(filename)
+        if info.checksum == chksum_content:
+            return False
 
-    outfile = None
-    try:
-        if which=="codegen":
-            if os.path.isfile(filename):
-                with open(filename, 'rb') as infile:
-                    win_line_ending = infile.readline().endswith(b"\r\n")
-            else:
-                win_line_ending = sys.platform.startswith("win")
+    # create the backup file only of existing files; get_backup_suffix() handles the first save only
+    if not os.path.isfile(filename):
+        backup = ""
 
-        if need_backup:
-            backup_name = filename + config.preferences.backup_suffix
-            if os.path.isfile(backup_name):
-                os.remove(backup_name)
-            os.rename(filename, backup_name)
-            config.backed_up[filename] = True
+    if which=="codegen":
+        if info is not None:
+            win_line_ending = info.win_line_ending
+        else:
+            win_line_ending = sys.platform.startswith("win")
+        if win_line_ending:
+            content = [line.replace(b"\n", b"\r\n") for line in content]
 
-        # create necessary subdirectories on demand
-        directory = os.path.dirname(filename)
-        if directory and not os.path.isdir(directory):
-            os.makedirs(directory)
+    # create necessary subdirectories on demand
+    directory = os.path.dirname(filename)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
 
-        outfile = open(filename, 'wb')
-        for line in content:
-            if which=="codegen" and win_line_ending:
-                line = line.replace(b"\n", b"\r\n")
-            outfile.write(line)
-        outfile.close()
-    finally:
-        if outfile:
-            outfile.close()
+    if atomic:
+        _write_file_atomic(filename, content, backup, durability)
+    else:
+        if backup:
+            _backup_file(filename, backup)
+        with open(filename, 'wb') as outfile:
+            for line in content:
+                outfile.write(line)
+
+    if backup and update_backed_up:
+        config.backed_up[filename] = True
+    return bool(backup)
+
+
+def get_backup_suffix(filename, which='wxg'):
+    """Returns the suffix for the backup copy of filename, if the user's preferences say so for the kind of file and
+    if it has not been backed up during this session yet; otherwise "". Call this from the main thread only."""
+    do_backup = config.preferences.wxg_backup if which=='wxg' else config.preferences.codegen_backup
+    if not do_backup or filename in config.backed_up:
+        return ""
+    return config.preferences.backup_suffix
+
+
+class FileSaver(object):
+    """Runs save_file() calls and similar jobs in a bounded pool of worker threads.
+
+    The jobs for different files are independent, so e.g. the checksum comparison of one file may overlap with the
+    writing of another. This is most useful for slow file systems like network drives.
+    Errors are re-raised by wait() in the order of submission, i.e. independent of the timing of the threads."""
+
+    def __init__(self, threads):
+        import multiprocessing.pool  # not imported at module level to keep the startup fast
+        self._pool = multiprocessing.pool.ThreadPool(threads)
+        self._jobs = []  # (filename, AsyncResult)
+        self.results = []  # (filename, return value) of the jobs that completed successfully; filled by wait()
+
+    def submit(self, filename, function, *args):
+        "Queue function(*args) for execution; filename is for error messages only"
+        self._jobs.append( (filename, self._pool.apply_async(function, args)) )
+
+    def wait(self):
+        """Wait for all jobs and shut down the pool.
+        The first exception in the order of submission is re-raised, the others are logged."""
+        if self._pool is None: return
+        self._pool.close()
+        error = None
+        try:
+            for filename, result in self._jobs:
+                try:
+                    self.results.append( (filename, result.get()) )
+                except Exception as details:
+                    if error is None:
+                        error = details
+                    else:
+                        logging.error( _('Error while saving "%s": %s'), filename, details )
+        finally:
+            self._pool.join()
+            self._pool = None
+            self._jobs = []
+        if error is not None:
+            raise error
+
+    def cancel(self):
+        "Discard all jobs that were not started yet and wait for the running ones"
+        if self._pool is None: return
+        self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+        self._jobs = []
 
 
 ########################################################################################################################
@@ -415,36 +713,159 @@ def get_name_for_autosave(filename=None):
 
 
 class _Writer(object):
-    # file with a list compatible interface: append and extend
+    # file with a list compatible interface: append and extend;
+    # the content is written as UTF-8 and the checksum is calculated on the fly; see _SmartChecksum
     def __init__(self, filename):
-        self.outfile = codecs.open(filename, 'w', 'utf-8')
+        self.outfile = open(filename, 'wb')
+        self.checksum = _SmartChecksum()
     def append(self, line):
+        line = line.encode('utf-8')
         self.outfile.write(line)
+        self.checksum.update(line)
     def extend(self, lines):
-        for line in lines: self.outfile.write(line)
-    def close(self):
+        for line in lines: self.append(line)
+    def close(self, sync=False):
+        # sync: flush the content to the disk, depending on the durability level; see _sync_file()
+        if sync and not self.outfile.closed:
+            _sync_file(self.outfile)
         self.outfile.close()
 
 
-def autosave_current():
-    "Save automatic backup copy for the current and un-saved design;  returns 0: error; 1: no changes to save; 2: saved"
-    if root.saved:
-        return 1            # do nothing in this case...
+def save_wxg(filename, app):
+    """Save the XML representation of app (usually root) to the named file, like save_file(filename, ..., 'wxg').
+
+    The XML is not collected in memory, but streamed into a temporary file in the same directory.
+    If the content did not change, the existing file will be kept. Otherwise, a backup copy will be created if the
+    user's preferences say so and the temporary file will be renamed to filename."""
+    # create necessary subdirectories on demand
+    directory = os.path.dirname(filename)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
 
-    autosave_name = get_name_for_autosave()
+    target = os.path.realpath(filename)  # if filename is a symbolic link, the file it points to is replaced
+    tmp_name = _create_temp_file(target)
     try:
-        outfile = _Writer(autosave_name)
-        root.write(outfile)
-        outfile.close()
-    except EnvironmentError as details:
-        logging.warning( _('Saving the autosave file "%s" failed: %s'), autosave_name, details )
-        return 0
-    return 2
+        outfile = _Writer(tmp_name)
+        try:
+            app.write(outfile)
+        except:
+            outfile.close()
+            raise
+
+        if os.path.isfile(target):
+            # nothing changed?
+            if _smart_checksum( _read_file(target) ) == outfile.checksum.hexdigest():
+                outfile.close()
+                return
+        outfile.close(sync=True)
+
+        # create the backup file only with the first save
+        backup = get_backup_suffix(filename) if os.path.isfile(target) else ""
+        _commit_temp_file(tmp_name, target, backup)
+        tmp_name = None
+        if backup:
+            config.backed_up[filename] = True
+    finally:
+        _remove_temp_file(tmp_name)
+
+
+class _Autosaver(object):
+    """Writes the autosave file, optionally in a worker thread; see autosave_current().
+
+    The design is serialized into a list of lines on the calling (GUI) thread, as the tree must not be accessed from
+    other threads. Encoding, the comparison with the last autosave and the file I/O may be done by a worker thread."""
+
+    def __init__(self):
+        self._thread = None
+        self._last = None   # (file name, checksum) of the last autosave file written
+        self._error = None  # (file name, exception) of a failed save in the worker thread; see _discard_error()
+
+    def busy(self):
+        "Returns True if the worker thread is still writing"
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self):
+        "Wait for the worker thread, if any"
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reset(self, filename):
+        "Forget about the autosave file filename, e.g. after it has been removed as the design was saved"
+        self.wait()
+        if self._last and self._last[0] == filename:
+            self._last = None
+        self._discard_error(filename)
+
+    def _discard_error(self, filename):
+        # a failed save of filename is not to be reported any more, as a later save succeeded or the file was removed
+        if self._error is not None and self._error[0] == filename:
+            self._error = None
+
+    def _write(self, filename, lines, durability):
+        # returns 1 if the content is unchanged, 2 if it was written; exceptions are not handled
+        content = [line.encode('utf-8') for line in lines]
+        checksum = _smart_checksum(content)
+        if self._last == (filename, checksum) and os.path.isfile(filename):
+            self._discard_error(filename)
+            return 1
+        self._last = None
+        _write_file_atomic(filename, content, "", durability)
+        self._last = (filename, checksum)
+        self._discard_error(filename)
+        return 2
+
+    def _run(self, filename, lines, durability):
+        # worker thread; must not modify any global state, e.g. the preferences or the umask of the process
+        try:
+            self._write(filename, lines, durability)
+        except Exception as details:
+            self._error = (filename, details)
+
+    def save(self, filename, app, background=False):
+        "Save app to filename; returns 0: error; 1: no changes to save or previous save still running; 2: saved"
+        if self.busy():
+            return 1
+        self.wait()
+        if self._error is not None and (background or self._error[0] != filename):
+            # the previous save in the worker thread failed; a foreground save of the same file will retry
+            (failed, details), self._error = self._error, None
+            logging.warning( _('Saving the autosave file "%s" failed: %s'), failed, details )
+            return 0
+
+        lines = []
+        app.write(lines)
+        durability = config.preferences.save_durability  # the preferences are accessed on the calling thread only
+        if background:
+            self._thread = threading.Thread(target=self._run, args=(filename, lines, durability), name="autosave")
+            self._thread.daemon = True
+            self._thread.start()
+            return 2
+        try:
+            return self._write(filename, lines, durability)
+        except EnvironmentError as details:
+            self._error = None
+            logging.warning( _('Saving the autosave file "%s" failed: %s'), filename, details )
+            return 0
+
+_autosaver = _Autosaver()
+
+
+def autosave_current(background=False):
+    """Save automatic backup copy for the current and un-saved design;  returns 0: error; 1: no changes to save; 2: saved
+
+    The autosave file is not written if the content did not change since the last call.
+    With background=True, the file is written by a worker thread. In this case, 2 means that the save has been started
+    and an error will be reported by the next call."""
+    if root.saved:
+        return 1            # do nothing in this case...
+    return _autosaver.save(get_name_for_autosave(), root, background)
 
 
 def remove_autosaved(filename=None):
     "Remove the automatic backup;  see: get_name_for_autosave()"
     autosave_name = get_name_for_autosave(filename)
+    _autosaver.reset(autosave_name)
     if os.path.exists(autosave_name):
         try:
             os.unlink(autosave_name)
@@ -793,7 +1214,11 @@ class Preferences(ConfigParser.ConfigParser):
         'autosave_delay': 120,  # in seconds
         'show_completion': True,
         'write_timestamp': True,
-        'write_generated_from': False
+        'write_generated_from': False,
+        'incremental_codegen': True,  # skip unchanged toplevel classes in multiple files mode
+        'codegen_threads': 4,         # threads for writing files in multiple files mode; 0 to write sequentially
+        'codegen_atomic_write': True, # write generated files to a temporary file first, then rename
+        'save_durability': 1          # 0: rename only; 1: flush file content before renaming; 2: flush directory too
         }
 
     def __init__(self, defaults=None):
@@ -916,21 +1341,18 @@ def format_xml_tag(tag, value, indentlevel=0, **kwargs):
     if 'is_xml' in kwargs:
         del kwargs['is_xml']
 
+    if is_xml:
+        return [format_xml_start_tag(tag, indentlevel, **kwargs)] + value + [format_xml_end_tag(tag, indentlevel)]
+
     tabs = u'    ' * indentlevel
     tag = encode_to_unicode(tag)
-
-    if not is_xml:
-        value = escape( encode_to_unicode(value) )
+    value = escape( encode_to_unicode(value) )
 
     attrs = format_xml_attrs(**kwargs)
     if attrs: attrs = u' %s' % attrs
 
     data = {'attrs': attrs, 'tabs': tabs, 'tag': tag, 'value': value }  # for the format string
 
-    if is_xml:
-        tmpl1 = u'%(tabs)s<%(tag)s%(attrs)s>\n'
-        tmpl2 = u'%(tabs)s</%(tag)s>\n'
-        return [tmpl1%data] + value + [tmpl2%data]
     if not value:
         tmpl = u'%(tabs)s<%(tag)s%(attrs)s />\n'
     else:
@@ -938,6 +1360,23 @@ def format_xml_tag(tag, value, indentlevel=0, **kwargs):
     return [tmpl%data]
 
 
+def format_xml_start_tag(tag, indentlevel=0, **kwargs):
+    """Generate the start tag for XML content that is written separately; see format_xml_end_tag().
+    This allows writing nested elements directly to the output instead of collecting them in a list first.
+
+    Example::
+        >>> common.format_xml_start_tag(u'object', 1, name='sizer_1')
+        u'    <object name="sizer_1">\n'"""
+    attrs = format_xml_attrs(**kwargs)
+    if attrs: attrs = u' %s' % attrs
+    return u'%s<%s%s>\n' % (u'    ' * indentlevel, encode_to_unicode(tag), attrs)
+
+
+def format_xml_end_tag(tag, indentlevel=0):
+    "Generate the end tag to match format_xml_start_tag()"
+    return u'%s</%s>\n' % (u'    ' * indentlevel, encode_to_unicode(tag))
+
+
 def format_xml_prop(tag, value, indentlevel=0, **kwargs):
     # format a single property as indented string
     assert isinstance(tag, compat.basestring)
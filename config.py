@@ -21,6 +21,8 @@ inform_screen_reader = None  # set if program starts for the first time and a sc
 
 testing = False  # to be set by the testing framework
 
+xml_parser = "expat"  # parser for loading .wxg files: "expat" for the faster direct one or "sax"
+
 
 # default configuration values #########################################################################################
 default_app_name = 'app'           # application name
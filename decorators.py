@@ -5,16 +5,106 @@ Collection of different decorators used by wxGlade
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
+import functools
+from collections import OrderedDict
 
-def memoize(func):
-    """\
-    Simple result cache.
-    """
-    cache = {}
-
-    def inner(*args, **kwargs):
-        key = str(args) + str(kwargs)
-        if key not in cache:
-            cache[key] = func(*args, **kwargs)
-        return cache[key]
-    return inner
+_MISSING = object()
+_KWARGS_MARK = object()  # separates positional and keyword arguments in cache keys
+
+_caches = []  # all LRUCache instances; see clear_caches()
+
+
+class LRUCache(object):
+    """Mapping with a maximum size; if the size is exceeded, the least recently used entry is discarded.
+    Hits and misses of get() are counted for statistics; see info().
+
+    on_discard: optional function to be called with key and value of entries discarded by size limit or clear()"""
+
+    def __init__(self, maxsize=128, name=None, on_discard=None):
+        self.maxsize = maxsize
+        self.name = name
+        self.on_discard = on_discard
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        _caches.append(self)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        "Return the cached value and mark it as most recently used"
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data[key] = value
+        self.hits += 1
+        return value
+
+    def pop(self, key, default=None):
+        "Remove the entry and return its value; counted like get()"
+        value = self.get(key, _MISSING)
+        if value is _MISSING: return default
+        del self._data[key]
+        return value
+
+    def __setitem__(self, key, value):
+        data = self._data
+        if key in data:
+            del data[key]
+        elif len(data) >= self.maxsize:
+            discarded = data.popitem(last=False)
+            if self.on_discard is not None: self.on_discard(*discarded)
+        data[key] = value
+
+    def clear(self):
+        "Discard all entries; the statistics are kept"
+        items = list(self._data.items())
+        self._data.clear()
+        if self.on_discard is not None:
+            for key, value in items:
+                self.on_discard(key, value)
+
+    def info(self):
+        "Return statistics as dict with keys name, hits, misses, size and maxsize"
+        return {"name":self.name, "hits":self.hits, "misses":self.misses, "size":len(self._data),
+                "maxsize":self.maxsize}
+
+
+def lru_cache(maxsize=128, ignore_self=False):
+    """Decorator to cache the results of a function in an LRUCache; all arguments must be hashable.
+
+    ignore_self: for methods: don't use the instance as part of the key, i.e. share the results between all instances;
+                 only for methods with results that don't depend on the instance
+
+    The cache is available as attribute 'cache' of the decorated function; see also clear_caches()"""
+    def decorator(func):
+        cache = LRUCache(maxsize, func.__name__)
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            key = args[1:] if ignore_self else args
+            if kwargs:
+                key += (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = cache[key] = func(*args, **kwargs)
+            return value
+        inner.cache = cache
+        return inner
+    return decorator
+
+
+def clear_caches():
+    "Clear all caches, e.g. after config.widget_config or the wx version for code generation have been modified"
+    for cache in _caches:
+        cache.clear()
+
+
+def cache_info():
+    "Return list of statistics of all caches; see LRUCache.info()"
+    return [cache.info() for cache in _caches]
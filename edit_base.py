@@ -24,6 +24,10 @@ else:
     _UniqueList = list
 
 
+class _XmlFragments(list):
+    "Output of EditBase._write(): lines and, for the children, tuples (editor, tabs); see EditBase.write()"
+
+
 class EditBase(np.PropertyOwner):
     IS_TOPLEVEL = IS_SLOT = IS_SIZER = IS_WINDOW = IS_ROOT = IS_TOPLEVEL_WINDOW = False
     IS_CLASS = None  # dynamically set during code generation if a class is generated for this item
@@ -35,6 +39,7 @@ class EditBase(np.PropertyOwner):
     #CHILDREN = 1  # 0 or a fixed number or None for e.g. a sizer with a variable number of children; -1 for 0 or 1
     ATT_CHILDREN = None
     TREE_ICON = None  # defaults to editor class name
+    _xml_cache = None  # (tabs, fragments) of the last call of write(); see invalidate_xml()
 
     def __init__(self, name, parent, index):
         assert self.WX_CLASS
@@ -216,6 +221,7 @@ class EditBase(np.PropertyOwner):
         return self.parent.children.index(self)
 
     def add_item(self, child, index=None):
+        self.invalidate_xml()
         if index is None:
             # happens during loading or pasting
             if self.CHILDREN is None:
@@ -237,11 +243,13 @@ class EditBase(np.PropertyOwner):
 
     def insert_item(self, child, index):
         # for now only for child=None as placeholder; used by notebook
+        self.invalidate_xml()
         self.children.insert(index, child)
 
     def remove_item(self, child, level, keep_slot=False):
         "Removes child from self and adjust pos of following items"
         if not child: return
+        self.invalidate_xml()
         if child in self.children:
             index = self.children.index(child)
             if keep_slot:
@@ -286,6 +294,7 @@ class EditBase(np.PropertyOwner):
         PROPERTIES.insert( PROPERTIES.index(after_property)+1, move_property )
 
     def properties_changed(self, modified):
+        self.invalidate_xml()
         if modified and "name" in modified and self.properties["name"].previous_value is not None:
             if config.debugging or config.testing:
                 assert self.IS_NAMED
@@ -376,7 +385,8 @@ class EditBase(np.PropertyOwner):
 
         # remove from Tree (rebuild_tree to be called separately)
         if misc.focused_widget is self: misc.focused_widget = None
-        common.app_tree.remove(self)  # remove mutual reference from widget to/from Tree item
+        if common.app_tree is not None:
+            common.app_tree.remove(self)  # remove mutual reference from widget to/from Tree item
 
         # bookkeeping
         if not self.IS_TOPLEVEL and self.IS_NAMED and self.name:
@@ -392,8 +402,38 @@ class EditBase(np.PropertyOwner):
     def get_editor_name(self):
         # the panel classes will return something else here, depending on self.scrollable
         return self.WXG_BASE or self.__class__.__name__
+    def invalidate_xml(self):
+        """Discard the XML cached by write() for self and all parents, as the output would be different now.
+        Called on property changes and when children are added or removed."""
+        item = self
+        while item is not None and not item.IS_ROOT:
+            if item._xml_cache is None: break  # parents are invalid already
+            item._xml_cache = None
+            item = item.parent
+
     def write(self, output, tabs):
-        "Writes the xml code for the widget to the given output file"
+        """Writes the xml code for the widget to the given output file.
+        The lines are cached, such that only modified widgets and their parents need to be serialized again.
+        The cache of a widget holds only its own lines; the children are stored as references to their caches."""
+        if config.debugging and getattr(self, "_restore_properties", None):
+            raise ValueError("properties not restored")
+        self.restore_properties()
+        if self._xml_cache is None or self._xml_cache[0]!=tabs:
+            fragments = _XmlFragments()
+            self._write(fragments, tabs)
+            self._xml_cache = (tabs, fragments)
+        if isinstance(output, _XmlFragments):
+            # called from the parent's _write(): store a reference only
+            output.append( (self, tabs) )
+            return
+        for fragment in self._xml_cache[1]:
+            if isinstance(fragment, tuple):
+                child, child_tabs = fragment
+                child.write(output, child_tabs)
+            else:
+                output.append(fragment)
+
+    def _write(self, output, tabs):
         # write object tag, including class, name, base
         classname = self.get_editor_name()
         # to disable custom class code generation (for panels...)
@@ -411,9 +451,6 @@ class EditBase(np.PropertyOwner):
                                                      common.format_xml_attrs(base=classname),
                                                      instance_class) )
 
-        if config.debugging and getattr(self, "_restore_properties", None):
-            raise ValueError("properties not restored")
-        self.restore_properties()
         # write properties, but without name and class
         # XXX be 100% compatible to 0.7.2, where option is written into the object; remove later
         properties = self.get_properties(without=set(MANAGED_PROPERTIES))
@@ -423,17 +460,15 @@ class EditBase(np.PropertyOwner):
         if self.IS_SIZER:
             for child in self.children or []:
                 if not child.IS_SLOT:
-                    inner_xml = []
+                    output.append( common.format_xml_start_tag(u'object', tabs+1, **{'class': 'sizeritem'}) )
 
                     for name in MANAGED_PROPERTIES:
                         name = child.properties[name]
                         if name is not None:
-                            name.write(inner_xml, tabs+2)
+                            name.write(output, tabs+2)
 
-                    child.write(inner_xml, tabs+2)
-                    stmt = common.format_xml_tag( u'object', inner_xml, tabs+1,
-                                                  is_xml=True, **{'class': 'sizeritem'} )
-                    output.extend(stmt)
+                    child.write(output, tabs+2)
+                    output.append( common.format_xml_end_tag(u'object', tabs+1) )
                 else:
                     child.write(output, tabs+1)
         elif self.children is not None or self.ATT_CHILDREN is not None:
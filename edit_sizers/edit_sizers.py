@@ -571,6 +571,7 @@ class SizerBase(edit_base.EditBase):
         # called from ManagedBase.__init__ when adding an item to the end from XML parser
         # or interactively when adding an item to an empty sizer slot
         # XXX unify with edit_base.EditBase.add_item
+        self.invalidate_xml()
         if index is None: index = len(self.children)
 
         if index==len(self.children):
@@ -600,7 +601,7 @@ class SizerBase(edit_base.EditBase):
             # size has been set in set_size, so we can just use GetSize here
             self.set_item_best_size(child, size=child.widget.GetSize())
         if self.widget:
-            self.window.widget.Layout()
+            np.request_layout(self.window)
 
     def destroying_child_widget(self, child, index):
         # previously in _free_slot
@@ -675,7 +676,7 @@ class SizerBase(edit_base.EditBase):
                     w,h = best_size
             self.widget.SetItemMinSize(widget.widget, w, h)
 
-        self.parent_window.layout()
+        np.request_layout(self.parent_window)
 
     def remove_item(self, child, level, keep_slot=False):
         "Removes elem from self"
@@ -1901,7 +1902,7 @@ def change_sizer(old, new):
         'wxFlexGridSizer': lambda: EditFlexGridSizer(old.name, parent, index, rows=0, cols=0),
         'wxGridBagSizer': lambda: EditGridBagSizer(old.name, parent, index, rows=0, cols=0) }
 
-    with old.window.frozen():
+    with old.window.frozen(), np.batched_changes():
         # construct without children, take then the children from the old sizer
         parent.children[index] = None  # avoid recursive_remove being called
         szr = constructors[new]()
@@ -1101,7 +1101,7 @@ class EditStylesMixin(np.PropertyOwner):
                 misc.focused_widget = self
                 if self.sel_marker: self.sel_marker.Show(True)
 
-    @decorators.memoize
+    @decorators.lru_cache(ignore_self=True)
     def wxname2attr(self, name):
         """Return the attribute specified by the name. Only wx attributes are supported.
 
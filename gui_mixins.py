@@ -51,24 +51,34 @@ class StylesMixin(object):
 
         if flags.isdigit(): return flags
 
+        # the result depends on the widget class and the wx version, i.e. the table, and on the language
+        table = self._get_style_table(self._get_for_version())
+        key = (getattr(self, 'language', None), flags)
+        formatted = table.formatted.get(key)
+        if formatted is not None: return formatted
+
         # split flags to set first
         oflags = flags
         flags = set(flags.split('|'))
 
         # check for non-supported, renamed flags and ...
-        if self.style_defs:
-            flags = self.process_styles(flags)
-            flags = self.combine_styles(flags)
+        if table.style_defs:
+            flags = table.process_styles(flags)
+            flags = table.combine_styles(flags)
 
         if hasattr(self, 'cn') and getattr(self, 'format_flags', True):
             flags = [self.cn(f) for f in flags if f]
 
         tmpl_flag_join = getattr(self, 'tmpl_flag_join', '|')
-        flags = tmpl_flag_join.join(sorted(flags))
+        flags = table.formatted[key] = tmpl_flag_join.join(sorted(flags))
 
         return flags
 
-    @decorators.memoize
+    def _get_for_version(self):
+        "Return the wx version of the code generator or None"
+        return getattr( getattr(self, 'codegen', None), 'for_version', None )
+
+    @decorators.lru_cache(256, ignore_self=True)
     def _get_widget_styles_defs(self, widget_name):
         """Logic of _get_style_defs() but extracted for cache decorator.
 
@@ -92,13 +102,21 @@ class StylesMixin(object):
         """Return all styles related to this widget as dict. This includes generic styles from config.widget_config.
 
         The implementation has moved to _get_widget_styles_defs() to use a
-        simple cache decorator instead of using an own cache implementation.
+        cache decorator instead of using an own cache implementation.
 
         see: config.widget_config, _get_widget_styles_defs()"""
         return self._get_widget_styles_defs(getattr(self, 'klass', None))
 
     style_defs = property(_get_style_defs)
 
+    def _get_style_table(self, for_version):
+        "Return the StyleTable for the widget class and the given wx version"
+        key = (getattr(self, 'klass', None), for_version)
+        table = _style_tables.get(key)
+        if table is None:
+            table = _style_tables[key] = StyleTable(self.style_defs, for_version)
+        return table
+
     def process_styles(self, flags):
         """Process the style attributes 'rename_to', 'include', 'exclude', 'supported_by' and 'require'.
         Returns processed flags as set.
@@ -106,7 +124,72 @@ class StylesMixin(object):
         flags: Flags to process as set
 
         see: The documentation of cn_f() contains more details of the flag handling process.
-             config.widget_config"""
+             config.widget_config, StyleTable"""
+        return self._get_style_table(self._get_for_version()).process_styles(flags)
+
+    def combine_styles(self, flags):
+        """Combine flags (attribute 'combination') and remove flags that are parts of other flags already.
+        Returns processed flags as set.
+
+        flags: Flags to combine and reduce as set
+
+        see: config.widget_config, StyleTable"""
+        return self._get_style_table(self._get_for_version()).combine_styles(flags)
+
+
+class StyleTable(object):
+    """Style definitions of a widget class, compiled into lookup tables for one wx version.
+
+    The tables are built once and used by StylesMixin.cn_f(), process_styles() and combine_styles().
+
+    style_defs:   the style definitions as returned by StylesMixin.style_defs
+    rename:       flag -> new name
+    include:      flag -> set of flags to add (soft requirement)
+    exclude:      flag -> set of flags to remove
+    require:      flag -> list of required flags (hard requirement)
+    unsupported:  flags that are not supported by the wx version
+    combinations: list of (set of flags, combined flag); same order as style_defs
+    parts:        flag -> set of flags this flag is combined of
+    formatted:    (language, flags) -> result of StylesMixin.cn_f()"""
+
+    def __init__(self, style_defs, for_version=None):
+        self.style_defs = style_defs
+        self.rename = {}
+        self.include = {}
+        self.exclude = {}
+        self.require = {}
+        self.unsupported = set()
+        self.combinations = []
+        self.parts = {}
+        self.formatted = {}
+
+        if for_version is not None:
+            major = 'wx%d' % for_version[0]
+            detailed = 'wx%d%d' % for_version
+        for name, details in style_defs.items():
+            if not isinstance(details, dict): continue
+            if 'rename_to' in details:
+                self.rename[name] = details['rename_to']
+            if 'include' in details:
+                self.include[name] = details['include']
+            if 'exclude' in details:
+                self.exclude[name] = details['exclude']
+            if 'require' in details:
+                self.require[name] = details['require']
+            if 'supported_by' in details and for_version is not None:
+                supported_by = details['supported_by']
+                if not (major in supported_by or detailed in supported_by):
+                    self.unsupported.add(name)
+            if 'combination' in details:
+                combination = details['combination']
+                self.combinations.append( (combination, details.get('rename_to', name)) )
+                self.parts[name] = combination
+
+        # flags that are relevant for process_styles() after renaming
+        self.processed = set(self.include) | set(self.exclude) | set(self.require) | self.unsupported
+
+    def process_styles(self, flags):
+        "Process the style attributes; see StylesMixin.process_styles()"
         assert isinstance(flags, set)
 
         # processing empty set()s causes later trouble with
@@ -114,48 +197,28 @@ class StylesMixin(object):
         if not flags:
             return flags
 
-        for flag in flags.copy():
-            try:
-                flags.add(self.style_defs[flag]['rename_to'])
-                flags.remove(flag)
-            except (AttributeError, KeyError):
-                pass
+        if self.rename:
+            rename = self.rename
+            flags = set( [rename.get(flag, flag) for flag in flags] )
 
         add = set()
         remove = set()
-        flag_list = list(flags)
-        flag_list.sort()
 
-        for required_by in flag_list:
+        # flags without definitions neither add nor remove anything
+        for required_by in sorted(flags & self.processed):
             if required_by in remove:
                 continue
-            try:
-                add |= self.style_defs[required_by]['include']
-            except (AttributeError, KeyError):
-                pass
-
-            try:
-                remove |= self.style_defs[required_by]['exclude']
-            except (AttributeError, KeyError):
-                pass
-
-            try:
-                supported_by = self.style_defs[required_by]['supported_by']
-                major = 'wx%d' % self.codegen.for_version[0]
-                detailed = 'wx%d%d' % self.codegen.for_version
-                if not (major in supported_by or detailed in supported_by):
+            if required_by in self.include:
+                add |= self.include[required_by]
+            if required_by in self.exclude:
+                remove |= self.exclude[required_by]
+            if required_by in self.unsupported:
+                remove.add(required_by)
+            for required in self.require.get(required_by, ()):
+                if required in remove:
                     remove.add(required_by)
-            except (AttributeError, KeyError):
-                pass
-
-            try:
-                for required in self.style_defs[required_by]['require']:
-                    if required in remove:
-                        remove.add(required_by)
-                    else:
-                        add.add(required)
-            except (AttributeError, KeyError):
-                pass
+                else:
+                    add.add(required)
 
         # drop flags from add if they should be removed
         add -= remove
@@ -166,39 +229,32 @@ class StylesMixin(object):
         return flags
 
     def combine_styles(self, flags):
-        """Combine flags (attribute 'combination') and remove flags that are parts of other flags already.
-        Returns processed flags as set.
-
-        flags: Flags to combine and reduce as set
-
-        see: config.widget_config"""
+        "Combine flags and remove flags that are parts of other flags; see StylesMixin.combine_styles()"
         # processing empty set()s causes later trouble with set([<filled>]) >= set()
         if not flags:
             return flags
 
         # combined flags: replace children by parent flag
-        for style in self.style_defs:
-            try:
-                if self.style_defs[style]['combination'] <= flags:
-                    flags -= self.style_defs[style]['combination']
-                    style = self.style_defs[style].get('rename_to', style)
-                    flags.add(style)
-            except KeyError:
-                pass
+        for combination, style in self.combinations:
+            if combination <= flags:
+                flags -= combination
+                flags.add(style)
 
         # combined flags: remove flags that are part of other flags already
+        parts = self.parts
         for flag in flags.copy():
             # ignore already eliminated flags
-            if flag not in flags:
+            if flag not in flags or flag not in parts:
                 continue
-            try:
-                flags -= self.style_defs[flag]['combination']
-            except (KeyError, TypeError):
-                pass
+            flags -= parts[flag]
 
         return flags
 
 
+# compiled style definitions per (widget class, wx version); see StylesMixin._get_style_table()
+_style_tables = decorators.LRUCache(512, "style tables")
+
+
 class BitmapMixin(object):
     "Class mixin to create wxBitmap instances from the given statement"
     _PROPERTY_HELP = {"bitmap":         "Bitmap to be shown on the widget normally.",
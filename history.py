@@ -6,6 +6,7 @@ license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
 import common, config, clipboard
+import new_properties as np
 
 
 class PropertyValue(object):
@@ -96,22 +97,26 @@ class History(object):
 
         repeat_actions.reverse()
 
-        # apply to the new widget
+        # apply to the new widget; the widget is notified and updated once at the end
         self._repeating = True  # don't set self._redo_widget
-        for action in repeat_actions:
-            if config.debugging:
-                print("Repeating %s"%action)
-            prop = focused_widget.properties[action.name]
-            if isinstance(action, HistorySetPropertyItem):
-                prop._change_value(action.value, action.checked)
-            elif isinstance(action, HistoryPropertyItem):
-                if prop.deactivated is None:
-                    # a property that can not be deactivated
-                    prop._check_for_user_modification(action.new.value)
-                else:
-                    force = action.new.deactivated!=prop.deactivated
-                    prop._check_for_user_modification(action.new.value, force=force, activate=not action.new.deactivated)
-        self._repeating = False
+        try:
+            with np.batched_changes():
+                for action in repeat_actions:
+                    if config.debugging:
+                        print("Repeating %s"%action)
+                    prop = focused_widget.properties[action.name]
+                    if isinstance(action, HistorySetPropertyItem):
+                        prop._change_value(action.value, action.checked)
+                    elif isinstance(action, HistoryPropertyItem):
+                        if prop.deactivated is None:
+                            # a property that can not be deactivated
+                            prop._check_for_user_modification(action.new.value)
+                        else:
+                            force = action.new.deactivated!=prop.deactivated
+                            prop._check_for_user_modification(action.new.value, force=force,
+                                                              activate=not action.new.deactivated)
+        finally:
+            self._repeating = False
 
     def _add_item(self, item):
         self.actions.insert(0, item)
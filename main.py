@@ -15,7 +15,7 @@ from xml.sax import SAXParseException
 
 # import project modules
 import application
-import common, config, compat, misc, history
+import common, config, compat, decorators, misc, history, profiling
 import new_properties as np
 import preferencesdialog, msgdialog, bugdialog, about
 import log
@@ -68,6 +68,16 @@ class FileDropTarget(wx.FileDropTarget):
         return True
 
 
+class _PropertyPage(object):
+    "A notebook page of the property panel; the page and the editor controls are re-used for widgets of the same class"
+    def __init__(self, name, panel, sizer):
+        self.name = name
+        self.panel = panel
+        self.scrolled = panel.GetParent()
+        self.sizer = sizer
+        self.editors = []  # [property name, sizer with the controls of the property, detached np._Editor or None]
+
+
 class wxGladePropertyPanel(wx.Panel):
     "Panel used to display the Properties of the various widgets"
     def __init__(self, parent):
@@ -78,6 +88,10 @@ class wxGladePropertyPanel(wx.Panel):
         self.next_widget = None           # the next one, will only be edited after a small delay
 
         self.pagenames = None
+        self.pages = []                   # _PropertyPage instances in the notebook
+        self.pages_key = None             # see _get_pages_key()
+        # the pages of recently edited widget classes, to be re-used
+        self._cached_pages = decorators.LRUCache(16, "property pages", self._destroy_pages)
 
         sizer = wx.BoxSizer(wx.VERTICAL)
         self.heading = wx.TextCtrl(self, style=wx.TE_READONLY)
@@ -115,8 +129,7 @@ class wxGladePropertyPanel(wx.Panel):
             return
         self.next_widget = widget
         if self.current_widget:
-            for editor in self.current_widget.properties.values():
-                editor.destroy_editor()
+            self._detach_editors()
             self.current_widget = None   # delete the reference
         wx.CallLater( 150, self.edit_properties, widget )
 
@@ -140,60 +153,72 @@ class wxGladePropertyPanel(wx.Panel):
         else:
             self.heading.SetValue( _('Properties') )
 
+    def _detach_editors(self):
+        # release the editor controls from the properties; create_editor() will re-use or destroy them
+        editors = {}
+        for name, prop in self.current_widget.properties.items():
+            editors[name] = prop.detach_editor()
+        for page in self.pages:
+            for entry in page.editors:
+                entry[2] = editors.get(entry[0])
+
+    def _get_pages_key(self, edit_widget):
+        "Return class and names of the pages and their properties; pages are re-used for widgets with the same key"
+        pages = []
+        names = None
+        for prop in edit_widget.PROPERTIES:
+            if prop[0].isupper():
+                names = None
+                if prop=="Layout" and not edit_widget._has_layout: continue
+                if prop=="Events" and edit_widget.events is None: continue
+                names = []
+                pages.append( (prop, names) )
+            elif names is not None and edit_widget.properties.get(prop) is not None:
+                names.append(prop)
+        pages = tuple( (pagename, tuple(names)) for pagename, names in pages )
+        return (edit_widget.__class__, getattr(edit_widget, "WX_CLASS", None), pages)
+
     def create_editor(self, edit_widget):
         # fill the frame with a notebook of property editors
+        # the pages and editor controls of the previous widget are re-used, if it's of the same class
         
         if not self.notebook: return  # already deleted
         self.current_widget_class = edit_widget.__class__
         if wx.Platform != "__WXMSW__" :
             focus_before = self.FindFocus()
-        self.notebook.Hide()
 
         # remember the notebook page to be selected
         selection = self.notebook.GetSelection()
         select_page = self.pagenames[selection]  if selection!=-1  else None
 
-        # clear notebook pages
-        if self.notebook.PageCount:
-            #self.notebook.DeleteAllPages()  # deletes also the windows on the pages
+        key = self._get_pages_key(edit_widget)  if edit_widget else  None
+        reuse = key==self.pages_key and self.pages
+        if reuse:
+            self.notebook.Freeze()
+        else:
+            self.notebook.Hide()
+            # keep the current pages for re-use; clear notebook pages
+            if self.pages:
+                self._cached_pages[self.pages_key] = self.pages
+                for page in self.pages:
+                    page.scrolled.Hide()
             while self.notebook.PageCount:
-                self.notebook.DeletePage(self.notebook.PageCount-1)
+                self.notebook.RemovePage(self.notebook.PageCount-1)
+            self.pages_key = key
+            self.pages = []
 
         self.pagenames = pagenames = []
-        self.sizers = []
         if not edit_widget: return
-        current_page = current_sizer = current_pagename = None
-        property_instance = None
-        for prop in edit_widget.PROPERTIES:
-            if prop[0].isupper():
-                # end previous page
-                if current_page is not None:
-                    self.end_page(current_page, current_sizer, current_pagename)
-                    current_page = None
-
-                # start new page
-                current_pagename = prop
-                if prop=="Layout" and not edit_widget._has_layout:continue
-                if prop=="Events" and edit_widget.events is None: continue
 
-                current_page = self.start_page(prop)
-                current_sizer = wx.BoxSizer(wx.VERTICAL)
-                self.sizers.append(current_sizer)
+        if not reuse:
+            self.pages = self._cached_pages.pop(key) or self._create_pages(key[-1])
+            for page in self.pages:
+                self.notebook.AddPage(page.scrolled, _(page.name))
 
-                self.pagenames.append(prop)
-
-                continue
-
-            if current_pagename=="Layout" and not edit_widget._has_layout: continue
-
-            # a property or None
-            property_instance_ = edit_widget.properties.get(prop)
-            if property_instance_ is not None:
-                property_instance = property_instance_
-                property_instance.create_editor(current_page, current_sizer)
-
-        if current_page is not None:
-            self.end_page(current_page, current_sizer, current_pagename)
+        for page in self.pages:
+            self._fill_page(page, edit_widget)
+            self.end_page(page)
+            pagenames.append(page.name)
 
         if select_page and select_page in pagenames:
             index = pagenames.index(select_page)
@@ -201,29 +226,78 @@ class wxGladePropertyPanel(wx.Panel):
         else:
             self.notebook.SetSelection(0)
 
-        self.notebook.Show()
+        if reuse:
+            self.notebook.Thaw()
+        else:
+            self.notebook.Show()
 
         if wx.Platform != "__WXMSW__" and focus_before is common.app_tree:
             focus_before.SetFocus()
 
+    def _create_pages(self, layout):
+        # create the pages, with a sizer for the controls of each property
+        pages = []
+        for pagename, names in layout:
+            page = self.start_page(pagename)
+            for name in names:
+                sizer = wx.BoxSizer(wx.VERTICAL)
+                page.sizer.Add(sizer, 0, wx.EXPAND)
+                page.editors.append( [name, sizer, None] )
+            page.sizer.AddSpacer(30)
+            pages.append(page)
+        return pages
+
+    def _fill_page(self, page, edit_widget):
+        # hand over the detached editor controls to the properties or re-create them
+        for entry in page.editors:
+            name, sizer, editor = entry
+            entry[2] = None
+            prop = edit_widget.properties[name]
+            if editor is not None:
+                if prop.attach_editor(editor): continue
+                editor.unbind()
+            # destroy the controls and create new ones
+            windows = list(self._get_windows(sizer))
+            sizer.Clear()
+            for window in windows:
+                if window: window.Destroy()
+            prop.create_editor(page.panel, sizer)
+            # the controls should grow as if they were added to the page sizer directly
+            proportion = sum(item.GetProportion() for item in sizer.GetChildren())
+            page.sizer.GetItem(sizer).SetProportion(proportion)
+
+    def _get_windows(self, sizer):
+        # all windows of the sizer, including nested sizers and static boxes
+        for item in sizer.GetChildren():
+            if item.IsWindow():
+                yield item.GetWindow()
+            elif item.IsSizer():
+                child = item.GetSizer()
+                if isinstance(child, wx.StaticBoxSizer):
+                    yield child.GetStaticBox()
+                for window in self._get_windows(child):
+                    yield window
+
+    def _destroy_pages(self, key, pages):
+        # discarded from self._cached_pages
+        for page in pages:
+            if page.scrolled: page.scrolled.Destroy()
+
     def start_page(self, name):
         # create a ScrolledWindow and a Panel; with only ScrolledWindow, scrolling on gtk 3 does not work
         scrolled = wx.ScrolledWindow( self.notebook, name=name)
         panel = wx.Panel(scrolled, name="%s properties"%name)
         if wx.VERSION[0]<3:
             panel.SetBackgroundColour(scrolled.GetBackgroundColour())
-        return panel
-
-    def end_page(self, panel, sizer, header, select=False):
-        sizer.AddSpacer(30)
+        sizer = wx.BoxSizer(wx.VERTICAL)
         panel.SetAutoLayout(1)
         panel.SetSizer(sizer)
-        sizer.Layout()
-        sizer.Fit(panel)
+        return _PropertyPage(name, panel, sizer)
 
-        scrolled = panel.GetParent()
-        self.notebook.AddPage(scrolled, _(header),select=select)
-        self._set_page_size(scrolled)
+    def end_page(self, page):
+        page.sizer.Layout()
+        page.sizer.Fit(page.panel)
+        self._set_page_size(page.scrolled)
 
     def _set_page_size(self, scrolled):
         # set ScrolledWindow and Panel to available size; enable scrolling, if required
@@ -247,8 +321,8 @@ class wxGladePropertyPanel(wx.Panel):
     def on_notebook_size(self, event):
         # calculate available size for pages
         if self._notebook_decoration_size:
-            for scrolled in self.notebook.GetChildren():
-                self._set_page_size(scrolled)
+            for page in self.pages:
+                self._set_page_size(page.scrolled)
         if event: event.Skip()
 
     def on_panel_size(self, event):
@@ -397,7 +471,8 @@ class wxGladeFrame(wx.Frame):
         style = wx.SP_3D | wx.SP_LIVE_UPDATE
         self.splitter1 = wx.SplitterWindow(self, style=style)
         self.splitter2 = wx.SplitterWindow(self.splitter1, style=style)
-        self.palette = wxGladePalettePanel(self.splitter2)
+        with profiling.startup.measure("palette"):
+            self.palette = wxGladePalettePanel(self.splitter2)
 
         # create the property and the tree frame
         common.property_panel = self.property_panel = wxGladePropertyPanel(self.splitter2)
@@ -738,7 +813,8 @@ class wxGladeFrame(wx.Frame):
         self.autosave_timer.Start( int(config.preferences.autosave_delay) * 1000 )
 
     def on_autosave_timer(self, event):
-        res = common.autosave_current()
+        # write in a worker thread to not block the GUI; a failure will be reported with the next tick
+        res = common.autosave_current(background=True)
         if res == 2:
             self.user_message(_("Auto saving... done"))
         elif not res:
@@ -1097,9 +1173,7 @@ class wxGladeFrame(wx.Frame):
 
     def _save_app(self, filename):
         try:
-            obuffer = []
-            common.root.write(obuffer)
-            common.save_file(filename, obuffer, 'wxg')
+            common.save_wxg(filename, common.root)
         except EnvironmentError as inst:
             if config.debugging: raise
             common.root.saved = False
@@ -1410,7 +1484,8 @@ class wxGlade(wx.App):
         self.locale = wx.Locale(wx.LANGUAGE_DEFAULT)  # avoid PyAssertionErrors
         #compat.wx_ArtProviderPush(wxGladeArtProvider())
 
-        frame = wxGladeFrame()
+        with profiling.startup.measure("main frame"):
+            frame = wxGladeFrame()
         self.SetTopWindow(frame)
         self.SetExitOnFrameDelete(True)
 
@@ -1499,13 +1574,15 @@ def main(filename=None):
     "if filename is not None, loads it"
     logging.info(_("Using wxPython %s"), config.wx_version)
     common.history = history.History()
-    app = wxGlade()
+    with profiling.startup.measure("application"):
+        app = wxGlade()
     if filename is not None:
         win = app.GetTopWindow()
         if os.path.splitext(filename)[1].upper() == ".XRC":
             win.import_xrc(filename)
         else:
-            win._open_app(filename, False)
+            with profiling.startup.measure("open file"):
+                win._open_app(filename, False)
 
             # mainly for debugging we want the first window to be opened already
             if filename and config.open_design_window and common.root.children:
@@ -1519,4 +1596,5 @@ def main(filename=None):
     ##win.import_xrc(r"D:\Python\Sources35\wxglade\wxglade_dev\tests\casefiles\CalendarCtrl.xrc")
     #win.import_xrc(r"D:\Python\Sources35\wxglade\wxglade_dev\tests\casefiles\AllWidgets_30.xrc")
 
+    profiling.startup.finish()
     app.MainLoop()
@@ -10,8 +10,8 @@ Interface to owner modified; see below for class PropertyOwner
 """
 
 import common, config, compat, logging, misc
-from collections import OrderedDict
-import re, os
+from collections import OrderedDict, deque
+import contextlib, re, os
 import wx
 
 if wx.Platform != '__WXMSW__':
@@ -54,8 +54,48 @@ def flush_current_property():
 misc.flush_functions.append(flush_current_property)
 
 
+class _Editor(object):
+    """The controls of a property editor.  The controls bind their events to the handlers of this object, which
+    forwards them to the property currently using the controls; the controls are re-used for the same property of
+    other widgets of the same class, see Property.detach_editor() and attach_editor()."""
+    __slots__ = ("property", "key", "controls", "bindings")
+
+    def __init__(self, prop):
+        self.property = prop
+        self.key = None       # see Property._get_editor_key()
+        self.controls = None  # while detached: attribute name -> control
+        self.bindings = []    # (window, event binder, handler) for windows not owned by the editor, e.g. the panel
+
+    def __getattr__(self, name):
+        # e.g. editor.on_focus is an event handler calling on_focus of the current property
+        if name.startswith("__"): raise AttributeError(name)
+        def handler(event):
+            if self.property is None:
+                # detached or to be destroyed
+                event.Skip()
+                return
+            getattr(self.property, name)(event)
+        return handler
+
+    def bind_panel(self, panel, event, name):
+        "bind an event of the panel, which outlives the editor controls; see unbind()"
+        handler = getattr(self, name)
+        panel.Bind(event, handler)
+        self.bindings.append( (panel, event, handler) )
+
+    def unbind(self):
+        "called when the controls are destroyed"
+        for window, event, handler in self.bindings:
+            if window: window.Unbind(event, handler=handler)
+        del self.bindings[:]
+
+
 class Property(object):
     "Base class for property editors"
+    # the state of each instance is stored in slots; attributes that are usually not set per instance, like the
+    # controls of the editor or deactivated, are class attributes and go to the instance dict only when modified
+    __slots__ = ("value", "previous_value", "owner", "name", "attributename", "modified", "blocked", "default_value",
+                 "controls", "editing", "__dict__")
     deactivated = None # None: can not be deactivated; otherwise bool value
     auto_activated = False # if True, it can be deactivated, but not by the user
     readonly = False
@@ -66,6 +106,9 @@ class Property(object):
     HAS_DATA = True
     min_version = None  # can be overwritten in instances; currently only used by BitmapProperty
     _error = _warning = None  # used by TextProperty and derived classes
+    enabler = None
+    _EXTRA_CONTROLNAMES = ["label_ctrl"]  # further controls, to be handed over when the editor is re-used
+    _editor = None  # _Editor, if the controls can be re-used; see _new_editor()
 
     def __init__(self, value, default_value=_DefaultArgument, name=None):#, write_always=False):
         self.value = value
@@ -104,6 +147,7 @@ class Property(object):
         optionally, the property will be activated or deactivated"""
         self.value = self._set_converter(value)
         self.modified = True
+        self._invalidate_owner()
         if activate is None and deactivate is None:
             self.update_display()
             if notify: self._notify()
@@ -124,6 +168,7 @@ class Property(object):
         if not self.name in self.owner._restore_data:
             self.owner._restore_data[self.name] = self.value
         self.value = value
+        self._invalidate_owner()
 
     def load(self, value, activate=None, deactivate=None, notify=False):
         # called from xml_parse ... add_property(self, name, val)
@@ -136,6 +181,7 @@ class Property(object):
         default_value = self._set_converter(default_value)
         if default_value==self.default_value: return
         self.default_value = default_value
+        self._invalidate_owner()
         if self.is_active(): return
         self.value = default_value
         self.update_display()
@@ -150,9 +196,15 @@ class Property(object):
         if active and not self.deactivated: return
         if not active and self.deactivated: return
         self.deactivated = not active
+        self._invalidate_owner()
         self.update_display()
         self.activate_controls()
 
+    def _invalidate_owner(self):
+        # the XML representation of the owner has changed; see EditBase.write()
+        if self.owner is not None:
+            self.owner.invalidate_xml()
+
     def set_blocked(self, block=True):
         if block and self.blocked: return
         if not block and not self.blocked: return
@@ -194,7 +246,8 @@ class Property(object):
     def _notify(self):
         self.modified = True
         common.root.saved = False
-        self.owner.properties_changed([self.name])
+        self._invalidate_owner()
+        notify_changed(self.owner, [self.name], self)
 
     def toggle_active(self, active=None, refresh=True):
         "Toggle the activation state"
@@ -208,6 +261,9 @@ class Property(object):
         self.on_value_edited(self.value, active)
         self.activate_controls()
 
+    def _on_enabler(self, event):
+        self.toggle_active(event.IsChecked())
+
     ####################################################################################################################
     # XML file
     def get_string_value(self):
@@ -250,9 +306,67 @@ class Property(object):
 
     def destroy_editor(self):
         # delete e.g. references to controls
+        if self._editor is not None:
+            self._editor.unbind()
+            self._editor.property = None
+            self._editor = None
+        for att in self.CONTROLNAMES:
+            setattr(self, att, None)
+        self.editing = False
+
+    def _new_editor(self):
+        """called from create_editor() of classes that support re-use of their controls;
+        the controls are to bind their events to the handlers of the returned _Editor"""
+        self._editor = editor = _Editor(self)
+        return editor
+
+    def _get_editor_key(self):
+        """Return a key for the state that determines the controls created by create_editor(); these can be re-used
+        by the same property of another widget if the keys are equal.  None if the controls can not be re-used.
+        A derived class overriding create_editor() needs to check whether this is still valid."""
+        return None
+
+    def detach_editor(self):
+        """Release the editor controls, e.g. when another widget is selected.
+        Returns them as _Editor for attach_editor() or None if they can not be re-used and are to be destroyed."""
+        editor = self._editor
+        if editor is None or not self.editing:
+            key = None
+        else:
+            key = self._get_editor_key()
+        if key is None:
+            self.destroy_editor()
+            return None
+        editor.key = key
+        editor.controls = controls = {}
         for att in self.CONTROLNAMES:
+            controls[att] = getattr(self, att)
             setattr(self, att, None)
+        for att in self._EXTRA_CONTROLNAMES:
+            control = self.__dict__.pop(att, None)
+            if control is not None: controls[att] = control
+        editor.property = None
+        self._editor = None
         self.editing = False
+        return editor
+
+    def attach_editor(self, editor):
+        """Take over the controls released by detach_editor() of the same property of another widget and display
+        the value; returns False if the controls don't match this property"""
+        if editor.property is not None or editor.key!=self._get_editor_key(): return False
+        for att, control in editor.controls.items():
+            setattr(self, att, control)
+        editor.controls = None
+        editor.property = self
+        self._editor = editor
+        self.editing = True
+        self._update_editor()
+        return True
+
+    def _update_editor(self):
+        # called from attach_editor(): update the controls for the state of this property
+        self.activate_controls()
+        self.update_display(start_editing=True)
 
     def update_display(self, start_editing=False):
         # when the value has changed
@@ -373,6 +487,7 @@ class PropertyRO(Property):
 
 class SpinProperty(Property):
     # int
+    __slots__ = ("val_range", "immediate")
     CONTROLNAMES = ["enabler", "spin"]
     def __init__(self, value, val_range=(0,1000), immediate=False, default_value=_DefaultArgument, name=None):
         # val_range: (min_value,max_value)
@@ -403,6 +518,7 @@ class SpinProperty(Property):
     def create_editor(self, panel, sizer):
         if self.val_range is None:
             self.val_range = (0, 1000)
+        editor = self._new_editor()
 
         hsizer = wx.BoxSizer(wx.HORIZONTAL)
         # label
@@ -418,7 +534,7 @@ class SpinProperty(Property):
                 self.enabler.SetLabel("Enable %s"%label_text)
                 self.enabler.SetMaxSize(size)
             self.enabler.SetValue(not self.deactivated)
-            self.enabler.Bind( wx.EVT_CHECKBOX, lambda event: self.toggle_active(event.IsChecked()) )
+            self.enabler.Bind(wx.EVT_CHECKBOX, editor._on_enabler)
             hsizer.Add(self.enabler, 0, wx.ALIGN_CENTER_VERTICAL|wx.LEFT, 3)
         self.spin = self.create_spin_ctrl(panel)
 
@@ -433,13 +549,17 @@ class SpinProperty(Property):
 
         self._set_tooltip(label, self.spin, self.enabler)
 
-        self.spin.Bind(wx.EVT_KILL_FOCUS, self.on_kill_focus) # by default, the value is only set when the focus is lost
-        self.spin.Bind(wx.EVT_SET_FOCUS, self.on_focus)
+        self.spin.Bind(wx.EVT_KILL_FOCUS, editor.on_kill_focus) # by default, the value is only set when the focus is lost
+        self.spin.Bind(wx.EVT_SET_FOCUS, editor.on_focus)
         if wx.Platform == '__WXMAC__' or self.immediate:
-            self.spin.Bind(wx.EVT_SPINCTRL, self.on_spin)
-            self.spin.Bind(wx.EVT_TEXT_ENTER, self.on_spin)   # we want the enter key (see style above)
+            self.spin.Bind(wx.EVT_SPINCTRL, editor.on_spin)
+            self.spin.Bind(wx.EVT_TEXT_ENTER, editor.on_spin)   # we want the enter key (see style above)
         self.editing = True
 
+    def _get_editor_key(self):
+        if self.readonly: return None
+        return (self.__class__, self.deactivated is None, self.val_range, self.immediate)
+
     def _create_spin_ctrl(self, panel):
         style = wx.TE_PROCESS_ENTER | wx.SP_ARROW_KEYS
         self.spin = wx.SpinCtrl( panel, -1, style=style, min=self.val_range[0], max=self.val_range[1] )
@@ -547,6 +667,11 @@ class LayoutProportionProperty(SpinProperty):
         if _is_gridbag(self.owner.sizer): return
         SpinProperty.create_editor(self, panel, sizer)
 
+    def _get_editor_key(self):
+        # no editor for items of a GridBagSizer
+        if _is_gridbag(self.owner.sizer): return None
+        return SpinProperty._get_editor_key(self)
+
 
 #class LayoutPosProperty(SpinProperty):
     #readonly = True
@@ -564,8 +689,8 @@ class LayoutSpanProperty(Property):
     TOOLTIP = "cell spanning for GridBagSizer items: rows, columns\nOnly editable if the adjacent cells are empty."
     # (int,int)
     CONTROLNAMES = ["rowspin","colspin"]
+    immediate = True
     def __init__(self, value):
-        self.immediate = True
         Property.__init__(self, value, default_value=(1,1), name="span")
 
     validation_re = re.compile(_leading + _ge_0 + _comma + _ge_0 + _trailing )  # match a pair of integers >=0
@@ -691,9 +816,12 @@ class CheckBoxProperty(Property):
         hsizer.AddStretchSpacer(5)
         sizer.Add(hsizer, 0, wx.EXPAND)
         self._set_tooltip(label, self.checkbox)
-        self.checkbox.Bind(wx.EVT_CHECKBOX, self.on_change_val)
+        self.checkbox.Bind(wx.EVT_CHECKBOX, self._new_editor().on_change_val)
         self.editing = True
 
+    def _get_editor_key(self):
+        return (self.__class__,)
+
     def update_display(self, start_editing=False):
         if start_editing: self.editing = True
         if not self.editing: return
@@ -718,6 +846,7 @@ class InvCheckBoxProperty(CheckBoxProperty):
 
 class RadioProperty(Property):
     # choice
+    __slots__ = ("values", "aliases", "labels", "tooltips", "columns")
     CONTROLNAMES = ["options"]
 
     def __init__(self, value, values, labels=None, columns=1, aliases=None, tooltips=None, default_value=_DefaultArgument,
@@ -781,14 +910,15 @@ class IntRadioProperty(RadioProperty):
 
 class _CheckListProperty(Property):
     # common base class for Flags and WidgetStyleFlags; keeps self.value_set as a set of strings
+    __slots__ = ("_names", "_values", "value_set")
     CONTROLNAMES = ["enabler", "_choices"]
     EXCLUDES = EXCLUDES2 = None  # EXCLUDES2 will be set dynamically
+    _choices = None
 
     def __init__(self, value, default_value=_DefaultArgument, name=None, names=None, values=None):
         self._names = names
         self._values = values  # these will sometimes only be calculated on demand, especially for WidgetStyle
         self.value_set = self._decode_value(value)
-        self.enabler = self._choices = None
         Property.__init__(self, None, default_value, name) # with value=None, as this is to be calculated on demand only
 
     def set_owner(self, owner, attributename):
@@ -892,9 +1022,14 @@ class _CheckListProperty(Property):
             sizer.Add(box_sizer, 0, wx.ALL | wx.EXPAND, 5)
 
         self.update_display(True)
+        editor = self._new_editor()
         for checkbox in self._choices:
             if checkbox is None: continue  # derived classes may not use all options, e.g. obsolete ones
-            checkbox.Bind(wx.EVT_CHECKBOX, self.on_checkbox)
+            checkbox.Bind(wx.EVT_CHECKBOX, editor.on_checkbox)
+
+    def _get_editor_key(self):
+        # the check boxes are enabled/disabled by update_display() only if EXCLUDES2 is set
+        return (self.__class__, tuple(self._names), self.EXCLUDES2 is None)
 
     def on_checkbox(self, event):
         index = self._choices.index( event.GetEventObject() )
@@ -1057,6 +1192,7 @@ class ManagedFlags(_CheckListProperty):
     # for ManagedBase.flags; e.g. wxEXPAND, wxALIGN_RIGHT,...,wxALL,
     # XXX handle combinations and exclusions
     # XXX support wxRESERVE_SPACE_EVEN_IF_HIDDEN for 3.x
+    __slots__ = ("styles", "style_defs")
 
     FLAG_DESCRIPTION = OrderedDict()
     FLAG_DESCRIPTION['Border'   ] = ['wxALL', 'wxLEFT', 'wxRIGHT', 'wxTOP', 'wxBOTTOM']
@@ -1125,6 +1261,7 @@ class ManagedFlags(_CheckListProperty):
 
 class WidgetStyleProperty(_CheckListProperty):
     # for widget style flags; XXX handle combinations and exclusions
+    __slots__ = ("styles", "style_defs")
     def __init__(self):
         # the value will be set later in set_owner()
         _CheckListProperty.__init__(self, value=0)
@@ -1221,9 +1358,10 @@ class WidgetStyleProperty(_CheckListProperty):
         sizer.Add(box_sizer, 0, wx.ALL | wx.EXPAND, 5)
 
         self.update_display(True)
+        editor = self._new_editor()
         for checkbox in self._choices:
             if checkbox is not None:
-                checkbox.Bind(wx.EVT_CHECKBOX, self.on_checkbox)
+                checkbox.Bind(wx.EVT_CHECKBOX, editor.on_checkbox)
 
     def write(self, output, tabs=0):
         if isinstance(self.default_value, set) and self.value_set==self.default_value and not self.modified: return
@@ -1253,14 +1391,16 @@ class ExpandoTextCtrl(wx.lib.expando.ExpandoTextCtrl):
 class TextProperty(Property):
     # text
     _HORIZONTAL_LAYOUT = True # label, checkbox, text in the same line; otherwise text will be in the second line
+    __slots__ = ("multiline", "strip", "fixed_height")
     CONTROLNAMES = ["enabler", "text"]
+    _EXTRA_CONTROLNAMES = ["label_ctrl", "additional_controls"]
     validation_re = None # for derived classes
     control_re = re.compile( r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]" )  # match ASCII control characters for stripping them
     STRIP = False
     _PROPORTION = 1
+    text = None
     def __init__(self, value="", multiline=False, strip=False, default_value=_DefaultArgument, name=None, fixed_height=False):
         self.multiline = multiline
-        self.text = None
         self.strip = strip
         self.fixed_height = fixed_height  # don't grow the edit field in vertical
         Property.__init__(self, value, default_value, name)
@@ -1317,6 +1457,7 @@ class TextProperty(Property):
 
     def create_editor(self, panel, sizer):
         "Actually builds the text control to set the value of the property interactively"
+        editor = self._new_editor()
 
         hsizer = wx.BoxSizer(wx.HORIZONTAL)
         # label
@@ -1333,7 +1474,7 @@ class TextProperty(Property):
                 self.enabler.SetLabel("Enable %s"%label_text)
                 self.enabler.SetMaxSize(size)
             self.enabler.SetValue(not self.deactivated)
-            self.enabler.Bind( wx.EVT_CHECKBOX, lambda event: self.toggle_active(event.IsChecked()) )
+            self.enabler.Bind(wx.EVT_CHECKBOX, editor._on_enabler)
             #hsizer.Add(self.enabler, 0, wx.ALIGN_CENTER_VERTICAL)
             hsizer.Add(self.enabler, 0, wx.ALIGN_CENTER_VERTICAL|wx.LEFT, 3)
         #else:
@@ -1349,7 +1490,7 @@ class TextProperty(Property):
                 self.enabler.Disable()
         elif self.deactivated is not None:
             self.text.Enable(not self.deactivated)
-        panel.Bind( wx.EVT_LEFT_DOWN, self._on_text_click )
+        editor.bind_panel(panel, wx.EVT_LEFT_DOWN, "_on_text_click")
         # layout of the controls / sizers
         if self._HORIZONTAL_LAYOUT:
             #self.text.SetMaxSize( (-1,200) )
@@ -1383,7 +1524,7 @@ class TextProperty(Property):
         self.editing = True
         
         if hasattr(self, "_on_label_dblclick"):
-            label.Bind(wx.EVT_LEFT_DCLICK, self._on_label_dblclick)
+            label.Bind(wx.EVT_LEFT_DCLICK, editor._on_label_dblclick)
             label.SetForegroundColour(wx.BLUE)
 
     def _on_text_click(self, event):
@@ -1413,11 +1554,12 @@ class TextProperty(Property):
         else:
             text = wx.TextCtrl( panel, -1, value or "", style=style )
         # bind KILL_FOCUS and Enter for non-multilines
-        text.Bind(wx.EVT_KILL_FOCUS, self.on_kill_focus)
-        text.Bind(wx.EVT_SET_FOCUS, self.on_focus)
+        editor = self._editor
+        text.Bind(wx.EVT_KILL_FOCUS, editor.on_kill_focus)
+        text.Bind(wx.EVT_SET_FOCUS, editor.on_focus)
         # XXX
-        text.Bind(wx.EVT_CHAR, self.on_char)
-        text.Bind(wx.EVT_TEXT, self._on_text)
+        text.Bind(wx.EVT_CHAR, editor.on_char)
+        text.Bind(wx.EVT_TEXT, editor._on_text)
         return text
 
     def _on_text(self, event):
@@ -1435,6 +1577,15 @@ class TextProperty(Property):
         # used e.g. by DialogProperty to create the button
         return []
 
+    def _get_editor_key(self):
+        # the enabler is only created if the property can be deactivated by the user
+        return (self.__class__, self.deactivated is None or self.auto_activated, self.readonly, self.multiline,
+                self.fixed_height, self.min_version)
+
+    def _update_editor(self):
+        Property._update_editor(self)
+        compat.SetToolTip(self.text, self._find_tooltip() or "")  # may include e.g. warnings
+
     def update_display(self, start_editing=False):
         # when the value has changed
         if start_editing: self.editing = True
@@ -1805,12 +1956,16 @@ class ComboBoxProperty(TextProperty):
     def create_text_ctrl(self, panel, value):
         combo = wx.ComboBox( panel, -1, self.value, choices=self.choices, style=self._CB_STYLE )
         combo.SetStringSelection(self.value)
-        combo.Bind(wx.EVT_COMBOBOX, self.on_combobox)
-        combo.Bind(wx.EVT_KILL_FOCUS, self.on_kill_focus)
-        combo.Bind(wx.EVT_SET_FOCUS, self.on_focus)
-        combo.Bind(wx.EVT_CHAR, self.on_char)
+        editor = self._editor
+        combo.Bind(wx.EVT_COMBOBOX, editor.on_combobox)
+        combo.Bind(wx.EVT_KILL_FOCUS, editor.on_kill_focus)
+        combo.Bind(wx.EVT_SET_FOCUS, editor.on_focus)
+        combo.Bind(wx.EVT_CHAR, editor.on_char)
         return combo
 
+    def _get_editor_key(self):
+        return TextProperty._get_editor_key(self) + (tuple(self.choices),)
+
     def set_choices(self, choices=None):
         if choices is not None:
             if choices==self.choices: return
@@ -1883,13 +2038,14 @@ class ListBoxPropertyD(ListBoxProperty):
 class DialogProperty(TextProperty):
     # for now, this is only a base class for FileName, Color and FontProperty
     CONTROLNAMES = ["enabler", "text"]#, "button"]
+    _EXTRA_CONTROLNAMES = ["label_ctrl", "additional_controls", "button"]
+    dialog = button = None
     def __init__(self, value="", multiline=False, strip=True, default_value=_DefaultArgument, name=None):
         TextProperty.__init__(self, value, multiline, strip, default_value, name)
-        self.dialog = self.button = None
     def create_additional_controls(self, panel, sizer, hsizer):
         # used e.g. by DialogProperty to create the button
         self.button = wx.Button(panel, -1, " ... ", size=(40,-1))
-        self.button.Bind(wx.EVT_BUTTON, self.display_dialog)
+        self.button.Bind(wx.EVT_BUTTON, self._editor.display_dialog)
         hsizer.Add(self.button, 0, wx.ALL | wx.ALIGN_CENTER, 3)
         self._update_button()
         return [self.button]
@@ -2271,8 +2427,11 @@ class GridProperty(Property):
                   lambda g, c: g.SetColFormatBool(c)]
     _DEFAULT_VALUES = {STRING:"",  INT:0, FLOAT:0.0, BOOL:False}
 
+    __slots__ = ("default_row", "with_index", "col_defs", "immediate", "can_add", "can_remove", "can_insert",
+                 "can_remove_last", "col_sizes", "cur_row", "cur_col", "editing_values", "_last_focus")
     CONTROLNAMES = ["btn", "buttons", "grid"]
     GROW = True
+    grid = None
     _PROPORTION = 5
     validation_res = None # one per column
     UPPERCASE_COLS = None # True,False,None per column for upper,lower,any
@@ -2301,7 +2460,6 @@ class GridProperty(Property):
             self.col_sizes = col_sizes
         self.cur_row = self.cur_col = 0
         self.editing_values = None # before pressing Apply; stored here because the editor grid might be deleted
-        self.grid = None
         self._last_focus = None
         self._initialize_indices()
 
@@ -3318,6 +3476,116 @@ def insert_after(PROPERTIES, after, *add):
         PROPERTIES.insert(i+1+j, name)
 
 ########################################################################################################################
+# batched notifications
+
+_batch_level = 0           # >0 while batched_changes() is active or the collected changes are being processed
+_pending_changes = deque() # [owner, modified names or None, [(property, previous_value),...]] in order of first change
+_pending_owners = {}       # id(owner) -> entry of _pending_changes
+_pending_layouts = []      # windows to be laid out when the outermost batch ends
+
+
+@contextlib.contextmanager
+def batched_changes():
+    """Defer the notifications via notify_changed() and the layouts via request_layout() until the outermost batch
+    ends; each owner is then notified once with the union of the modified property names.
+    Used e.g. when loading or pasting, where each property would otherwise trigger updates of widgets and layouts."""
+    global _batch_level
+    _batch_level += 1
+    try:
+        yield
+    except BaseException:
+        # the changes might be incomplete; don't process them, neither now nor with the next batch
+        _batch_level -= 1
+        if not _batch_level: _discard_changes()
+        raise
+    _batch_level -= 1
+    if not _batch_level: flush_changes()
+
+
+def notify_changed(owner, modified, prop=None):
+    """Call owner.properties_changed(modified) or, while batched_changes() is active, collect the names for later.
+    prop: the modified property, if its previous_value is to be available when the owner is notified later"""
+    if not _batch_level:
+        owner.properties_changed(modified)
+        return
+    entry = _pending_owners.get(id(owner))
+    if entry is None:
+        entry = _pending_owners[id(owner)] = [owner, None if modified is None else list(modified), []]
+        _pending_changes.append(entry)
+    elif entry[1] is not None:
+        if modified is None:
+            entry[1] = None
+        else:
+            entry[1].extend( [name for name in modified if not name in entry[1]] )
+    if prop is not None and prop.previous_value is not None:
+        # keep the value from before the batch; the caller will reset previous_value after this call
+        if not any(p is prop for p, previous_value in entry[2]):
+            entry[2].append( (prop, prop.previous_value) )
+
+
+def request_layout(window):
+    "Call window.layout() or, while batched_changes() is active, once when the outermost batch ends"
+    if not _batch_level:
+        window.layout()
+    elif not any(w is window for w in _pending_layouts):
+        _pending_layouts.append(window)
+
+
+def _discard_changes():
+    "Drop the changes and layouts collected so far without notifying"
+    _pending_changes.clear()
+    _pending_owners.clear()
+    del _pending_layouts[:]
+
+
+def flush_changes():
+    """Notify the owners about the changes collected by notify_changed() so far;
+    inside batched_changes(), the layouts are still deferred until the outermost batch ends"""
+    global _batch_level
+    _batch_level += 1  # collect the notifications and layouts that are triggered by the notifications
+    try:
+        while _pending_changes:
+            owner, modified, previous_values = _pending_changes.popleft()
+            del _pending_owners[id(owner)]  # further changes are collected in a new entry
+            for prop, previous_value in previous_values:
+                prop.previous_value = previous_value
+            try:
+                owner.properties_changed(modified)
+            finally:
+                for prop, previous_value in previous_values:
+                    prop.previous_value = None
+    except Exception:
+        # don't process stale changes with the next batch
+        _discard_changes()
+        raise
+    finally:
+        _batch_level -= 1
+    if _batch_level: return
+    while _pending_layouts:
+        window = _pending_layouts.pop(0)
+        if window.widget: window.layout()
+
+
+########################################################################################################################
+
+class _PropertyAccess(object):
+    """Descriptor to return the value of a property as attribute of the owner, e.g. owner.name;
+    installed per class by PropertyOwner.add_property() to avoid the fallback to PropertyOwner.__getattr__"""
+    __slots__ = ("attname",)
+
+    def __init__(self, attname):
+        self.attname = attname
+
+    def __get__(self, obj, objtype=None):
+        if obj is None: return self
+        try:
+            prop = obj.properties[self.attname]
+        except KeyError:
+            # another instance of the same class may not have this property
+            raise AttributeError("%r object has no attribute %r" %(obj.__class__, self.attname))
+        # return the value (either the user-provided or the default value)
+        return prop.get()
+
 
 class PropertyOwner(object):
     def __init__(self):
@@ -3335,6 +3603,10 @@ class PropertyOwner(object):
         else:
             self.property_names.append(attname)
         prop.set_owner(self, attname)
+        cls = self.__class__
+        if not hasattr(cls, attname):
+            # first property with this name for this class; class attributes still take precedence, as before
+            setattr(cls, attname, _PropertyAccess(attname))
     def __getattr__(self, attr):
         if attr in self.properties:
             # return the value (either the user-provided or the default value)
@@ -3344,7 +3616,7 @@ class PropertyOwner(object):
         if isinstance(value, Property):
             self.add_property(value, name)
             return
-        if name!="properties" and name in self.properties and config.debugging:
+        if config.debugging and name!="properties" and name in self.properties:
             raise ValueError("implementation error: property about to be overwritten")
         object.__setattr__(self, name, value)
     def copy_properties(self, other, properties, notify=True):
@@ -3364,10 +3636,13 @@ class PropertyOwner(object):
             if new!=old:
                 prop.set(new)
         if notify:
-            self.properties_changed(properties)
+            notify_changed(self, properties)
     def check_property_modification(self, name, value, new_value):
         # return False in derived class to veto a user modification
         return True
+    def invalidate_xml(self):
+        "called when a property value has been modified; EditBase will discard the XML cached by write()"
+        pass
     def properties_changed(self, modified):
         """properties edited; trigger actions like widget or sizer update;
         'modified' is None or a list of property names;
@@ -3391,6 +3666,7 @@ class PropertyOwner(object):
         for name, value in d.items():
             self.properties[name].value = value
         del self._restore_data
+        self.invalidate_xml()
 
     def check_prop(self, name):
         if not name in self.properties: return False
@@ -6,16 +6,20 @@ Functions to import modules
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import os, re, sys, zipfile, logging
+import copy, os, re, sys, zipfile, logging
 from collections import OrderedDict
 
-import common, config, misc
+import common, config, decorators, misc, profiling
 
 # Regex tp match section headers; optionally with a hotkey character
 rec_section = re.compile(r'\[(?P<section>[^]]+)\](\:(?P<hotkey>[A-Z]))?')
 
-# Regex to match modules
-rec_module = re.compile(r'^(?P<module>\w+)')
+# Regex to match modules; optionally followed by the names of the XML base classes provided by the module
+rec_module = re.compile(r'^(?P<module>\w+)(?P<classes>(?:[ \t]+\w+)*)')
+
+# widget modules registered for loading on first use; see register_lazy_widgets() and load_widget_class()
+_lazy_modules = {}  # (widget_dir, module name) -> list of XML base class names
+_lazy_classes = {}  # XML base class name -> (widget_dir, module name)
 
 
 def load_widgets_from_dir(widget_dir, submodule='', default_section='not_set'):
@@ -48,46 +52,113 @@ def load_widgets_from_dir(widget_dir, submodule='', default_section='not_set'):
         buttons[section] = []
 
         for module_name in module_names:
-            if submodule:
-                fqmn = "%s.%s" % (module_name, submodule)
-            else:
-                fqmn = "%s" % module_name
-    
-            # step 1: import widget module
-            module = import_module(widget_dir, fqmn)
-            if not module: continue  # error already logged
-    
-            # step 2: use individual initialisation if available
-            if hasattr(module, 'initialize'):
-                button = module.initialize()
-                if config.use_gui and button: buttons[section].append(button)
-    
-            # step 3: import and initialise Python codegen as well as widget GUI elements
-            elif not submodule:
-                result, button = _init_codegen_gui(widget_dir, module_name)
-                if not result: continue
-                if config.use_gui and button: buttons[section].append(button)
-    
-            # step 4: do special initialisation for wconfig submodules
-            elif submodule and submodule == 'wconfig':
-                _process_widget_config(module)
-                # don't log this action
-                continue
-    
-            else:
-                logging.warning(_('Missing function "initialize()" in imported module %s. Skip initialisation.'), fqmn)
-                continue
-    
+            # modules registered for lazy loading will be loaded by load_widget_class()
+            if (widget_dir, module_name) in _lazy_modules: continue
+            with profiling.startup.measure("module %s%s" % (module_name, submodule and "."+submodule)):
+                result, button = _load_widget_module(widget_dir, module_name, submodule)
+            if not result: continue
+            if config.use_gui and button: buttons[section].append(button)
+
             if config.use_gui and not submodule.endswith('codegen'):
                 logging.info('\t%s', module_name)
     return buttons
 
 
-def _modulenames_from_file(filename, default_section):
+def _load_widget_module(widget_dir, module_name, submodule=''):
+    """Import and initialise a single widget module or one of its submodules.
+
+    returns (bool, wx.BitmapButton)"""
+    if submodule:
+        fqmn = "%s.%s" % (module_name, submodule)
+    else:
+        fqmn = "%s" % module_name
+
+    # step 1: import widget module
+    module = import_module(widget_dir, fqmn)
+    if not module: return False, None  # error already logged
+
+    # step 2: use individual initialisation if available
+    if hasattr(module, 'initialize'):
+        return True, module.initialize()
+
+    # step 3: import and initialise Python codegen as well as widget GUI elements
+    if not submodule:
+        return _init_codegen_gui(widget_dir, module_name)
+
+    # step 4: do special initialisation for wconfig submodules
+    if submodule == 'wconfig':
+        _process_widget_config(module)
+        # don't log this action
+        return False, None
+
+    logging.warning(_('Missing function "initialize()" in imported module %s. Skip initialisation.'), fqmn)
+    return False, None
+
+
+def register_lazy_widgets(widget_dir):
+    """Register the widgets listed in widgets.txt in the given directory for loading on first use.
+
+    Only modules with the names of their XML base classes in widgets.txt are registered;
+    all other modules will be loaded by load_widgets_from_dir() as usual.
+
+    see: load_widget_class()"""
+    module_classes = {}
+    _modulenames_from_file(os.path.join(widget_dir, 'widgets.txt'), 'not_set', module_classes)
+    for module_name, class_names in module_classes.items():
+        if not class_names: continue
+        _lazy_modules[(widget_dir, module_name)] = class_names
+        for base in class_names:
+            _lazy_classes[base] = (widget_dir, module_name)
+
+
+def load_widget_class(base):
+    """Load the widget module providing the XML base class, if it's registered for lazy loading.
+
+    The module and its submodules are initialised in the same order as for the initial loading:
+    widget configuration, Python code generator and GUI elements, remaining language code generators.
+
+    returns True if the module has been loaded
+
+    see: register_lazy_widgets(), common.init_codegen()"""
+    key = _lazy_classes.get(base)
+    if key is None or key not in _lazy_modules: return False
+    widget_dir, module_name = key
+    for name in _lazy_modules.pop(key):
+        del _lazy_classes[name]
+
+    _load_widget_module(widget_dir, module_name, 'wconfig')
+    pygen = common.code_writers.get('python')
+    known_builders = set(pygen.obj_builders) if pygen else set()
+    result, button = _load_widget_module(widget_dir, module_name)
+    if not result: return False
+    _copy_to_preview(pygen, known_builders)
+    for lang in ['perl', 'lisp']:
+        if lang in common.code_writers:
+            _load_widget_module(widget_dir, module_name, '%s_codegen' % common.code_writers[lang].lang_prefix)
+    logging.debug('Loaded widget module %s for %s', module_name, base)
+    return True
+
+
+def _copy_to_preview(pygen, known_builders):
+    """Register the Python code generators of a lazily loaded widget module with the preview code generator, too.
+    The preview code generator is a deep copy of the Python one, made by common.init_codegen() before."""
+    preview = common.code_writers.get('preview')
+    if pygen is None or preview is None or preview is pygen: return
+    for name, builder in pygen.obj_builders.items():
+        if name in known_builders: continue
+        builder = copy.copy(builder)
+        if getattr(builder, "codegen", None) is pygen:
+            builder.codegen = preview
+        preview.register_widget_code_generator(name, builder)
+
+
+def _modulenames_from_file(filename, default_section, module_classes=None):
     """Return OrderedDict with module sections as key and assigned list of module names read from given file.
 
     @param filename: Absolute filename of the widgets.txt file
-    @param default_section: Section name to group all widgets, if no section has been found"""
+    @param default_section: Section name to group all widgets, if no section has been found
+    @param module_classes: Optional dict to be filled with module names as key and assigned list of XML base
+                           class names as listed after the module name"""
     content = OrderedDict()
 
     # test if the "widgets.txt" file exists
@@ -122,6 +193,8 @@ def _modulenames_from_file(filename, default_section):
         mo = rec_module.match(line)
         if mo:
             content[cursect].append(mo.group('module'))
+            if module_classes is not None:
+                module_classes[mo.group('module')] = mo.group('classes').split()
 
     # remove empty sections
     for section in list(content.keys()):
@@ -157,6 +230,8 @@ def _process_widget_config(module):
         config.widget_config[config_dict['wxklass']] = config_dict
     except KeyError:
         pass
+    # cached style and event lookups may depend on the previous configuration
+    decorators.clear_caches()
 
     return True
 
@@ -0,0 +1,160 @@
+"""
+Simple wall time profiling of wxGlade stages, e.g. of the startup
+
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+import json, logging, os, time
+
+_clock = getattr(time, "perf_counter", time.time)
+
+
+class _Measurement(object):
+    "Context manager to measure the wall time of the enclosed block; see Profile.measure()"
+    __slots__ = ("profile", "key", "start")
+
+    def __init__(self, profile, key):
+        self.profile = profile
+        self.key = key
+
+    def __enter__(self):
+        self.start = _clock()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.profile.add(self.key, _clock() - self.start)
+        return False
+
+
+class _NoMeasurement(object):
+    "Context manager that does nothing; used if profiling is disabled"
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        return False
+
+_NO_MEASUREMENT = _NoMeasurement()
+
+
+class Profile(object):
+    """Accumulates number of calls and wall time per key.
+
+    columns:  names of the key elements; keys are tuples of the same length
+    enabled:  if False, measure() and add() do nothing
+    filename: report file name for finish(); the report is written in JSON format if the name ends with .json"""
+
+    def __init__(self, columns):
+        self.columns = tuple(columns)
+        self.enabled = False
+        self.filename = None
+        self.data = {}  # key -> [calls, total time]
+
+    def enable(self, filename=None):
+        self.enabled = True
+        self.filename = filename
+        self.data.clear()
+
+    def measure(self, *key):
+        "Return a context manager that measures the wall time of the enclosed block"
+        if not self.enabled: return _NO_MEASUREMENT
+        return _Measurement(self, key)
+
+    def add(self, key, duration):
+        if not self.enabled: return
+        entry = self.data.get(key)
+        if entry is None:
+            self.data[key] = [1, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+
+    def get_rows(self, sort_by_key=False):
+        "Return list of (key, calls, total time) tuples; sorted by key or by descending time"
+        rows = [(key, calls, total) for key, (calls, total) in self.data.items()]
+        if sort_by_key:
+            rows.sort()
+        else:
+            rows.sort(key=lambda row: (-row[2], row[0]))
+        return rows
+
+    def format_report(self, sort_by_key=False):
+        "Return the report as text table"
+        rows = [key + ("%d"%calls, "%.6f"%total, "%.3f"%(1000.0*total/calls))
+                for key, calls, total in self.get_rows(sort_by_key)]
+        header = self.columns + ("calls", "total [s]", "per call [ms]")
+        widths = [max([len(header[i])] + [len(row[i]) for row in rows]) for i in range(len(header))]
+        n = len(self.columns)
+        lines = []
+        for row in [header] + rows:
+            cells = [cell.ljust(width) for cell, width in zip(row[:n], widths)]
+            cells += [cell.rjust(width) for cell, width in zip(row[n:], widths[n:])]
+            lines.append( "  ".join(cells).rstrip() )
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, filename, sort_by_key=False):
+        "Write the report to a text or - if the file name ends with .json - a JSON file"
+        if os.path.splitext(filename)[1].lower() == ".json":
+            rows = [dict(zip(self.columns, key), calls=calls, total=total)
+                    for key, calls, total in self.get_rows(sort_by_key)]
+            content = json.dumps(rows, indent=1, sort_keys=True) + "\n"
+        else:
+            content = self.format_report(sort_by_key)
+        with open(filename, "w") as outfile:
+            outfile.write(content)
+
+    def finish(self, sort_by_key=False):
+        "Write the report to the file given to enable(), if any, and disable profiling"
+        if not self.enabled: return
+        self.enabled = False
+        if not self.filename: return
+        try:
+            self.write_report(self.filename, sort_by_key)
+        except EnvironmentError as details:
+            logging.warning( _("Can't write profiling report %s: %s"), self.filename, details )
+        else:
+            logging.info( _("Profiling report written to %s"), self.filename )
+
+
+def _wrap(profile, method, key):
+    def wrapper(*args, **kwds):
+        start = _clock()
+        try:
+            return method(*args, **kwds)
+        finally:
+            profile.add(key, _clock() - start)
+    wrapper.__name__ = getattr(method, "__name__", "wrapper")
+    wrapper.__doc__ = getattr(method, "__doc__", None)
+    return wrapper
+
+
+def instrument(profile, obj, method_names, *key):
+    """Replace the given methods of obj by wrappers adding their wall time to profile under key + (method name,).
+    Methods that are missing or already replaced are skipped.
+
+    returns list of replaced method names; see uninstrument()"""
+    ret = []
+    for name in method_names:
+        if name in obj.__dict__: continue
+        method = getattr(obj, name, None)
+        if method is None: continue
+        setattr( obj, name, _wrap(profile, method, key + (name,)) )
+        ret.append(name)
+    return ret
+
+
+def uninstrument(obj, method_names):
+    "Restore the methods replaced by instrument()"
+    for name in method_names:
+        delattr(obj, name)
+
+
+# wall time of the startup stages; see wxglade.py --profile-startup
+# nested stages are included in the time of the enclosing stage
+startup = Profile(["stage"])
+
+# calls and wall time of the widget code writer methods; see wxglade.py --profile-codegen
+# and BaseLangCodeWriter.generate_code(); nested calls, e.g. of cn_f(), are included in the time of the caller
+codegen = Profile(["language", "class", "method"])
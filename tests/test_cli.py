@@ -7,8 +7,8 @@
 
 from testsupport_new import WXGladeCLITest
 
-import common, wxglade
-import unittest, os
+import common, config, plugins, wxglade
+import unittest, glob, os, shutil, subprocess, sys
 
 
 class TestCodegen(WXGladeCLITest):
@@ -20,6 +20,173 @@ class TestCodegen(WXGladeCLITest):
     def test_codegen_AllWidgets_28(self):
         self.generate('AllWidgets_28')
 
+    def test_batch_codegen(self):
+        "Test generation of several files in one run; the output paths are taken from the projects"
+        self._test_batch_codegen(jobs=1)
+
+    def test_batch_codegen_parallel(self):
+        "Test generation of several files with a pool of worker processes"
+        self._test_batch_codegen(jobs=2)
+
+    def _test_batch_codegen(self, jobs):
+        basenames = ['AllWidgets_28', 'AllWidgets_30']
+        filenames = []
+        for basename in basenames:
+            # copy to the output directory, as the project's output paths are relative
+            filename = os.path.join(self.outDirectory, '%s.wxg'%basename)
+            shutil.copyfile( self._get_inputfile_path('%s.wxg'%basename), filename )
+            filenames.append(filename)
+
+        results = wxglade.command_line_batch_code_generation(filenames, "python", jobs)
+        self.assertEqual( [filename for filename, success, duration in results], filenames )
+        self.assertTrue( all(success for filename, success, duration in results) )
+
+        for basename in basenames:
+            expected_filename = self._get_casefile_path( '%s.py'%basename )
+            self._compare_files( expected_filename, os.path.join(self.outDirectory, '%s.py'%basename) )
+
+    def test_incremental_codegen_output(self):
+        "Test that the generated files are the same with and without skipping of unchanged classes"
+        filename = os.path.join(self.outDirectory, 'PyOgg2.wxg')
+        shutil.copyfile( self._get_casefile_path('PyOgg2.wxg'), filename )
+        basenames = ['PyOgg2_app.py', 'PyOgg2_MyDialog.py', 'PyOgg2_MyFrame.py']
+        # existing files with manually added code; modified to trigger re-writing
+        for basename in basenames:
+            with open(self._get_casefile_path(basename), "rb") as infile:
+                content = infile.read().replace(b"(500, 300)", b"(300, 300)")
+            with open(os.path.join(self.outDirectory, basename), "wb") as outfile:
+                outfile.write(content)
+
+        incremental_codegen = config.preferences.incremental_codegen
+        try:
+            # without cache, with cache to be filled and with all classes being skipped
+            for incremental in (False, True, True):
+                config.preferences.incremental_codegen = incremental
+                wxglade._init_guiless_app()
+                self.assertTrue( wxglade._generate_code(filename, "python") )
+                for basename in basenames:
+                    self._compare_files( self._get_casefile_path(basename), os.path.join(self.outDirectory, basename) )
+        finally:
+            config.preferences.incremental_codegen = incremental_codegen
+
+    def test_xml_cache(self):
+        "Test that the XML cached by EditBase.write() is updated on modifications"
+        wxglade._init_guiless_app()
+        self.assertTrue( wxglade._guiless_open_app(self._get_casefile_path('AllWidgets_30.wxg')) )
+
+        def write(cached=True):
+            if not cached:
+                # discard all cached fragments
+                editors = list(common.root.children)
+                while editors:
+                    editor = editors.pop()
+                    editor._xml_cache = None
+                    editors.extend( c for c in editor.get_all_children() if c is not None )
+            ret = []
+            common.root.write(ret)
+            return ret
+
+        original = write()
+        self.assertEqual( write(), original )
+        self.assertEqual( write(cached=False), original )
+
+        button = common.root.children[0].find_children(name="button_3")[0]
+        button.properties["label"].set("modified label")
+        modified = write()
+        self.assertNotEqual( modified, original )
+        self.assertEqual( modified, write(cached=False) )
+
+        # proportion is written by the sizer
+        button.properties["proportion"].set(3)
+        modified = write()
+        self.assertEqual( modified, write(cached=False) )
+        self.assertTrue( any("<option>3</option>" in line for line in modified) )
+
+        # the cache of the toplevel window holds references to the caches of the children, not their lines
+        toplevel = common.root.children[0]
+        self.assertTrue( any(isinstance(fragment, tuple) for fragment in toplevel._xml_cache[1]) )
+        self.assertFalse( any('name="button_3"' in fragment for fragment in toplevel._xml_cache[1]
+                              if not isinstance(fragment, tuple)) )
+
+        # removing a child invalidates the parent
+        button.recursive_remove(0)
+        modified = write()
+        self.assertEqual( modified, write(cached=False) )
+        self.assertFalse( any('name="button_3"' in line for line in modified) )
+
+    def test_event_types(self):
+        "Test the table of event types per wx version of a widget code writer"
+        writer = common.code_writers['python'].obj_builders['wxCalendarCtrl']
+        event_types, default_type = writer._get_event_types((2, 8))
+        self.assertEqual( default_type, 'wxCalendarEvent' )
+        self.assertEqual( event_types['EVT_CALENDAR'], 'wxCalendarEvent' )
+        self.assertEqual( event_types['EVT_CALENDAR_PAGE_CHANGED'], None )
+        event_types, default_type = writer._get_event_types((3, 0))
+        self.assertEqual( event_types['EVT_CALENDAR_PAGE_CHANGED'], 'wxCalendarEvent' )
+        self.assertTrue( writer._get_event_types((3, 0))[0] is event_types )
+
+    def test_expat_loader(self):
+        "Test that the expat based loader builds the same trees as the SAX based one"
+        def load(filename, xml_parser):
+            config.xml_parser = xml_parser
+            wxglade._init_guiless_app()
+            if not wxglade._guiless_open_app(filename): return None
+            ret = []
+            common.root.write(ret)
+            return ret
+
+        xml_parser = config.xml_parser
+        try:
+            for filename in sorted( glob.glob(os.path.join(self.caseDirectory, '*.wxg')) ):
+                self.assertEqual( load(filename, "expat"), load(filename, "sax"), filename )
+        finally:
+            config.xml_parser = xml_parser
+
+    def test_lazy_widget_loading(self):
+        "Test the XML base class names in widgets.txt and the loading of widget modules on first use"
+        module_classes = {}
+        plugins._modulenames_from_file( os.path.join(config.widgets_path, 'widgets.txt'), 'not_set', module_classes )
+        for module_name, class_names in module_classes.items():
+            self.assertTrue( class_names, module_name )
+            for base in class_names:
+                self.assertTrue( base in common.widgets_from_xml, '%s: %s'%(module_name, base) )
+
+        builder = common.widgets_from_xml.pop('EditGauge')
+        plugins.register_lazy_widgets(config.widgets_path)
+        try:
+            self.assertTrue( plugins.load_widget_class('EditGauge') )
+            self.assertTrue( 'EditGauge' in common.widgets_from_xml )
+            self.assertFalse( plugins.load_widget_class('EditGauge') )
+            self.assertFalse( plugins.load_widget_class('EditNonExisting') )
+        finally:
+            common.widgets_from_xml['EditGauge'] = builder
+            plugins._lazy_modules.clear()
+            plugins._lazy_classes.clear()
+
+    def test_lazy_codegen(self):
+        "Test code generation with widget modules loaded on first use, incl. the preview code generator"
+        # the test suite loads all widget modules on startup; batch mode is run in a separate process
+        filename = os.path.abspath( os.path.join(self.outDirectory, 'AllWidgets_28.wxg') )
+        shutil.copyfile( self._get_inputfile_path('AllWidgets_28.wxg'), filename )
+        generated_filename = os.path.join(self.outDirectory, 'AllWidgets_28.py')
+        preview_filename = os.path.abspath( os.path.join(self.outDirectory, 'AllWidgets_28_preview.py') )
+        for generated in (generated_filename, preview_filename):
+            if os.path.exists(generated): os.remove(generated)
+        # wxglade needs to be imported first, as it installs _()
+        script = ("import sys, wxglade, common, plugins\n"
+                  "wxglade.init_stage1(None)\n"
+                  "wxglade.init_stage2(False)\n"
+                  "if not plugins._lazy_classes: sys.exit('widget modules were not registered for lazy loading')\n"
+                  "wxglade._init_guiless_app()\n"
+                  "if not wxglade._generate_code(sys.argv[1], 'python'): sys.exit(1)\n"
+                  "common.root.generate_code(preview=True, out_path=sys.argv[2])\n")
+        subprocess.check_call( [sys.executable, "-c", script, filename, preview_filename], cwd=config.wxglade_path )
+
+        self._compare_files( self._get_casefile_path('AllWidgets_28.py'), generated_filename )
+        self.assertTrue( os.path.isfile(preview_filename) )
+        with open(preview_filename) as infile:
+            self.assertTrue( "class All_Widgets_Frame(wx.Frame):" in infile.read() )
+
 
 if __name__ == '__main__':
     unittest.main(exit=False)
@@ -260,6 +260,20 @@ class TestCodeGen(WXGladeCLITest):
                 '%s: Unexpected result for line "%s":\n   got: "%s"\nexpect: "%s"' % (lang, line, result.groups(), expected)
                 )
 
+    def test_replace_tags(self):
+        "Test replacement of tags in the content of existing source files; see codegen._TaggedLines"
+        import codegen
+        lines = ["a\n", "<12G34wxGlade replace A>", "b\n", "<12G34wxGlade replace B>\n", "<12G34wxGlade replace A>"]
+        expected = list(lines)
+        content = codegen._TaggedLines(list(lines))
+        for tag, code in [ ("<12G34wxGlade replace A>", ["x\n", "y\n"]),
+                           ("<12G34wxGlade replace B>", "z\n"),
+                           ("<12G34wxGlade replace A>", "again\n"),
+                           ("<12G34wxGlade replace C>", "missing\n") ]:
+            self.assertEqual( content.replace(tag, code), codegen._replace_tag(expected, tag, code) )
+        self.assertEqual( content.get_lines(), expected )
+        self.assertEqual( expected, ["a\n", "x\n", "y\n", "b\n", "z\n\n", "x\n", "y\n"] )
+
     def test_content_notfound(self):
         """\
         Test replacement of not found blocks with a warning message
@@ -0,0 +1,39 @@
+"""
+@copyright: 2020 Dietmar Schwertberger
+
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+
+import testsupport_new  # sets up the path and the translation function _()
+
+import decorators
+import unittest
+
+
+class TestDecorators(unittest.TestCase):
+    "Test the decorators module"
+
+    def test_lru_cache(self):
+        "Test the size bound, the statistics and the invalidation of decorators.lru_cache"
+        calls = []
+        @decorators.lru_cache(3)
+        def square(value):
+            calls.append(value)
+            return value*value
+
+        for value in (1, 2, 3, 1, 4, 2):
+            self.assertEqual( square(value), value*value )
+        # 2 was the least recently used entry when 4 was added
+        self.assertEqual( calls, [1, 2, 3, 4, 2] )
+        info = square.cache.info()
+        self.assertEqual( (info["hits"], info["misses"], info["size"]), (1, 5, 3) )
+
+        decorators.clear_caches()
+        self.assertEqual( len(square.cache), 0 )
+        square(1)
+        self.assertEqual( calls[-1], 1 )
+
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
@@ -0,0 +1,372 @@
+"""
+@copyright: 2020 Dietmar Schwertberger
+
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+
+from testsupport_new import WXGladeCLITest
+
+import common, config, wxglade
+import unittest, glob, os, shutil, stat, threading
+
+
+class TestFileIO(WXGladeCLITest):
+    "Test reading and writing of project files, generated files and the caches of code generation"
+
+    def test_incremental_codegen(self):
+        "Test that unchanged toplevel classes are skipped when generating separate files for each class"
+        filename = os.path.join(self.outDirectory, 'PyOgg2.wxg')
+        shutil.copyfile( self._get_casefile_path('PyOgg2.wxg'), filename )
+        generated_dialog = os.path.join(self.outDirectory, 'PyOgg2_MyDialog.py')
+        generated_frame  = os.path.join(self.outDirectory, 'PyOgg2_MyFrame.py')
+        for generated in (generated_dialog, generated_frame):
+            if os.path.exists(generated): os.remove(generated)
+
+        writer = common.code_writers["python"]
+        def generated_classes():
+            wxglade._init_guiless_app()
+            self.assertTrue( wxglade._generate_code(filename, "python") )
+            return sorted(code_obj.klass for code_obj in writer.classes if code_obj.IS_TOPLEVEL)
+
+        incremental_codegen = config.preferences.incremental_codegen
+        config.preferences.incremental_codegen = True
+        try:
+            self.assertEqual( generated_classes(), ['PyOgg2_MyDialog', 'PyOgg2_MyFrame'] )
+            # nothing changed
+            self.assertEqual( generated_classes(), [] )
+            # a modified output file will be re-generated
+            with open(generated_dialog, 'a') as outfile:
+                outfile.write("\n")
+            self.assertEqual( generated_classes(), ['PyOgg2_MyDialog'] )
+        finally:
+            config.preferences.incremental_codegen = incremental_codegen
+
+    def test_incremental_codegen_xml_cache(self):
+        "Test that the checksums for incremental code generation re-use the XML cached for saving and vice versa"
+        filename = os.path.join(self.outDirectory, 'PyOgg2.wxg')
+        shutil.copyfile( self._get_casefile_path('PyOgg2.wxg'), filename )
+        incremental_codegen = config.preferences.incremental_codegen
+        config.preferences.incremental_codegen = True
+        try:
+            wxglade._init_guiless_app()
+            self.assertTrue( wxglade._generate_code(filename, "python") )
+        finally:
+            config.preferences.incremental_codegen = incremental_codegen
+        caches = [toplevel._xml_cache for toplevel in common.root.children]
+        self.assertTrue( all(caches) )
+        common.save_wxg(filename, common.root)
+        self.assertTrue( all(toplevel._xml_cache is cache for toplevel, cache in zip(common.root.children, caches)) )
+
+    def test_save_wxg(self):
+        "Test streaming a project into a .wxg file; unchanged files must not be written again"
+        wxglade._init_guiless_app()
+        self.assertTrue( wxglade._guiless_open_app(self._get_casefile_path('AllWidgets_30.wxg')) )
+        filename = os.path.join(self.outDirectory, 'AllWidgets_30_saved.wxg')
+        if os.path.exists(filename): os.remove(filename)
+
+        common.save_wxg(filename, common.root)
+        expected = []
+        common.root.write(expected)
+        with open(filename, 'rb') as infile:
+            self.assertEqual( infile.read().decode('utf-8'), u"".join(expected) )
+
+        # saving again must keep the file
+        os.utime(filename, (0, 0))
+        common.save_wxg(filename, common.root)
+        self.assertEqual( os.stat(filename).st_mtime, 0 )
+
+    def test_read_file_info(self):
+        "Test that an existing source file is read only once for merging and for the check for modifications"
+        filename = os.path.join(self.outDirectory, 'existing.py')
+        with open(filename, 'wb') as outfile:
+            outfile.write(b"# generated by wxGlade 0.1\r\nline 1\r\nline 2  \r\n")
+        lines, info = common._read_file_info(filename)
+        self.assertEqual( lines, list(common._read_file(filename)) )
+        self.assertEqual( info.checksum, common._smart_checksum(lines) )
+        self.assertTrue( info.win_line_ending )
+
+        # unchanged content: the file is not written
+        mtime = os.stat(filename).st_mtime
+        common.save_file(filename, [b"# generated by wxGlade 0.2\n", b"line 1\n", b"line 2\n"], 'codegen', info)
+        self.assertEqual( os.stat(filename).st_mtime, mtime )
+
+        # modified content: the line ending is kept
+        common.save_file(filename, [b"line 1\n", b"line 3\n"], 'codegen', info)
+        with open(filename, 'rb') as infile:
+            self.assertEqual( infile.read(), b"line 1\r\nline 3\r\n" )
+        self.assertFalse( info.is_current() )
+
+    def test_read_existing_files_once(self):
+        "Test that each existing source file is read only once per code generation run"
+        filename = os.path.join(self.outDirectory, 'PyOgg2.wxg')
+        shutil.copyfile( self._get_casefile_path('PyOgg2.wxg'), filename )
+        basenames = ['PyOgg2_app.py', 'PyOgg2_MyDialog.py', 'PyOgg2_MyFrame.py']
+        for basename in basenames:
+            # existing files, modified to be written again
+            with open(self._get_casefile_path(basename), "rb") as infile:
+                content = infile.read().replace(b"(500, 300)", b"(300, 300)")
+            with open(os.path.join(self.outDirectory, basename), "wb") as outfile:
+                outfile.write(content)
+
+        reads = []
+        def counting_open(name, mode="r", *args, **kwargs):
+            if not "w" in mode: reads.append( os.path.basename(name) )
+            return open(name, mode, *args, **kwargs)
+        incremental_codegen = config.preferences.incremental_codegen
+        config.preferences.incremental_codegen = False  # otherwise unchanged classes would not be read at all
+        common.open = counting_open  # files are read by common._read_file_info() and common.save_file()
+        try:
+            wxglade._init_guiless_app()
+            self.assertTrue( wxglade._generate_code(filename, "python") )
+        finally:
+            del common.open
+            config.preferences.incremental_codegen = incremental_codegen
+        self.assertEqual( sorted(name for name in reads if name.endswith(".py")), sorted(basenames) )
+        for basename in basenames:
+            self._compare_files( self._get_casefile_path(basename), os.path.join(self.outDirectory, basename) )
+
+    def test_file_saver_main_thread(self):
+        "Test that the worker threads of the code writer don't access the preferences and config.backed_up"
+        filename = os.path.join(self.outDirectory, 'PyOgg2.wxg')
+        shutil.copyfile( self._get_casefile_path('PyOgg2.wxg'), filename )
+        basenames = ['PyOgg2_MyDialog.py', 'PyOgg2_MyFrame.py']
+        for basename in basenames:
+            # existing files, modified to be backed up and written again
+            with open(self._get_casefile_path(basename), "rb") as infile:
+                content = infile.read().replace(b"0, 300))", b"0, 301))")
+            with open(os.path.join(self.outDirectory, basename), "wb") as outfile:
+                outfile.write(content)
+            config.backed_up.pop(os.path.join(self.outDirectory, basename), None)
+
+        main_thread = threading.current_thread()
+        accesses = []
+        class Preferences(object):
+            def __getattr__(self, name):
+                if threading.current_thread() is not main_thread: accesses.append(name)
+                return getattr(preferences, name)
+        class BackedUp(dict):
+            def __setitem__(self, key, value):
+                if threading.current_thread() is not main_thread: accesses.append(key)
+                dict.__setitem__(self, key, value)
+
+        preferences, backed_up = config.preferences, config.backed_up
+        settings = {"codegen_threads":4, "codegen_backup":True, "incremental_codegen":False}
+        previous = dict( (name, getattr(preferences, name)) for name in settings )
+        for name, value in settings.items():
+            setattr(preferences, name, value)
+        config.preferences, config.backed_up = Preferences(), BackedUp(backed_up)
+        try:
+            wxglade._init_guiless_app()
+            self.assertTrue( wxglade._generate_code(filename, "python") )
+            generated = dict(config.backed_up)
+        finally:
+            config.preferences, config.backed_up = preferences, backed_up
+            for name, value in previous.items():
+                setattr(preferences, name, value)
+        self.assertEqual( accesses, [] )
+
+        # the backup copies are recorded after the worker threads have finished
+        for basename in basenames:
+            name = os.path.join(self.outDirectory, basename)
+            self.assertTrue( generated.get(name) )
+            with open(name + preferences.backup_suffix, "rb") as infile:
+                self.assertTrue( b"0, 301))" in infile.read() )
+            self._compare_files( self._get_casefile_path(basename), name )
+
+    def test_file_saver(self):
+        "Test writing files in worker threads and the atomic write mode of save_file()"
+        def fail(filename):
+            raise IOError("can't write %s" % filename)
+
+        saver = common.FileSaver(4)
+        filenames = [os.path.join(self.outDirectory, 'saved_%d.py'%i) for i in range(20)]
+        for filename in filenames:
+            if os.path.exists(filename): os.remove(filename)
+        umask = common._get_umask()
+        for i, filename in enumerate(filenames):
+            if i in (7, 13):
+                saver.submit(filename, fail, filename)
+            else:
+                saver.submit(filename, common.save_file, filename, [b"line %d\n"%i], 'codegen', None, True, "", 0)
+        # the first error in the order of submission is raised
+        with self.assertRaises(IOError) as context:
+            saver.wait()
+        self.assertTrue( str(context.exception).endswith("saved_7.py") )
+
+        for i, filename in enumerate(filenames):
+            if i in (7, 13):
+                self.assertFalse( os.path.exists(filename) )
+                continue
+            with open(filename, 'rb') as infile:
+                self.assertEqual( infile.read().rstrip(b"\r\n"), b"line %d"%i )
+            # new files get the default permissions
+            if os.name!="nt":
+                self.assertEqual( stat.S_IMODE(os.stat(filename).st_mode), 0o666 & ~umask )
+        # the umask of the process must not be modified by the worker threads
+        self.assertEqual( common._get_umask(), umask )
+        # no temporary files are left
+        self.assertEqual( glob.glob(os.path.join(self.outDirectory, 'saved_*.tmp')), [] )
+
+    def test_atomic_save(self):
+        "Test that save_wxg(), autosave_current() and save_file() leave no temporary files for all durability levels"
+        filename = os.path.join(self.outDirectory, 'AllWidgets_30.wxg')
+        shutil.copyfile( self._get_casefile_path('AllWidgets_30.wxg'), filename )
+        wxglade._init_guiless_app()
+        self.assertTrue( wxglade._guiless_open_app(filename) )
+        expected = []
+        common.root.write(expected)
+        expected = "".join(expected).encode("utf-8")
+
+        autosave_name = common.get_name_for_autosave()
+        try:
+            for durability in (0, 1, 2):
+                config.preferences.save_durability = durability
+                common.root.saved = False
+                self.assertEqual( common.autosave_current(), 2 )
+                with open(autosave_name, 'rb') as infile:
+                    self.assertEqual( infile.read(), expected )
+                self.assertEqual( common.autosave_current(), 1 )  # unchanged
+                common.remove_autosaved()
+                umask = common._get_umask()
+                self.assertEqual( common.autosave_current(background=True), 2 )
+                common._autosaver.wait()
+                with open(autosave_name, 'rb') as infile:
+                    self.assertEqual( infile.read(), expected )
+                # the worker thread created the file with the default permissions and left the umask unchanged
+                if os.name!="nt":
+                    self.assertEqual( stat.S_IMODE(os.stat(autosave_name).st_mode), 0o666 & ~umask )
+                self.assertEqual( common._get_umask(), umask )
+                common.remove_autosaved()
+                common.save_file(filename + ".py", [b"durability %d\n"%durability], 'codegen')
+                common.save_wxg(filename, common.root)
+        finally:
+            del config.preferences.save_durability
+            common.remove_autosaved()
+        self.assertEqual( glob.glob(os.path.join(self.outDirectory, '*.tmp')), [] )
+
+    def test_autosave_error(self):
+        "Test that the failure of a background autosave is reported, unless a later save of the same file succeeded"
+        wxglade._init_guiless_app()
+        self.assertTrue( wxglade._guiless_open_app(self._get_casefile_path('AllWidgets_30.wxg')) )
+        def fail(filename, content, backup, durability=None):
+            raise IOError("can't write %s" % filename)
+        def failed_background_save():
+            common.remove_autosaved()
+            common.root.saved = False
+            common._write_file_atomic = fail
+            try:
+                self.assertEqual( common.autosave_current(background=True), 2 )
+                common._autosaver.wait()
+            finally:
+                common._write_file_atomic = write_file_atomic
+
+        write_file_atomic = common._write_file_atomic
+        try:
+            # the error is reported with the next call
+            failed_background_save()
+            self.assertEqual( common.autosave_current(background=True), 0 )
+            self.assertEqual( common.autosave_current(background=True), 2 )
+            common._autosaver.wait()
+
+            # a successful save in the foreground discards the error
+            failed_background_save()
+            self.assertEqual( common.autosave_current(), 2 )
+            self.assertEqual( common.autosave_current(background=True), 2 )
+            common._autosaver.wait()
+
+            # saving the design removes the autosave file and discards the error
+            failed_background_save()
+            common.remove_autosaved()
+            self.assertEqual( common.autosave_current(background=True), 2 )
+            common._autosaver.wait()
+        finally:
+            common.remove_autosaved()
+
+    def test_atomic_backup(self):
+        "Test that the original file is kept in place until it's replaced, when a backup is created"
+        filename = os.path.join(self.outDirectory, 'backup.py')
+        backup_name = filename + config.preferences.backup_suffix
+        with open(filename, 'wb') as outfile:
+            outfile.write(b"old\n")
+        if os.path.exists(backup_name): os.remove(backup_name)
+        config.backed_up.pop(filename, None)
+
+        # simulate a crash before the temporary file is renamed
+        def crash(src, dst):
+            raise IOError("crash")
+        replace_file = common._replace_file
+        common._replace_file = crash
+        try:
+            with self.assertRaises(IOError):
+                common.save_file(filename, [b"new\n"], 'codegen')
+        finally:
+            common._replace_file = replace_file
+        for name in (filename, backup_name):
+            with open(name, 'rb') as infile:
+                self.assertEqual( infile.read(), b"old\n" )
+
+        config.backed_up.pop(filename, None)
+        common.save_file(filename, [b"new\n"], 'codegen')
+        with open(filename, 'rb') as infile:
+            self.assertEqual( infile.read().rstrip(b"\r\n"), b"new" )
+        with open(backup_name, 'rb') as infile:
+            self.assertEqual( infile.read(), b"old\n" )
+        self.assertEqual( glob.glob(os.path.join(self.outDirectory, 'backup.py.*.tmp')), [] )
+
+    @unittest.skipIf(not hasattr(os, "symlink") or os.name=="nt", "symbolic links not supported")
+    def test_atomic_save_symlinks(self):
+        "Test that atomic saving replaces the target of a symbolic link and keeps the link"
+        directory = os.path.join(self.outDirectory, 'link_targets')
+        if not os.path.isdir(directory): os.makedirs(directory)
+        wxglade._init_guiless_app()
+        self.assertTrue( wxglade._guiless_open_app(self._get_casefile_path('AllWidgets_30.wxg')) )
+        expected = []
+        common.root.write(expected)
+        expected = u"".join(expected).encode("utf-8")
+
+        # a .wxg file and a generated file
+        for basename, save in ( ('linked.wxg', lambda name: common.save_wxg(name, common.root)),
+                                ('linked.py',  lambda name: common.save_file(name, [expected], 'codegen')) ):
+            target = os.path.join(directory, basename)
+            link = os.path.join(self.outDirectory, basename)
+            for name in (target, link):
+                if os.path.lexists(name): os.remove(name)
+            with open(target, 'wb') as outfile:
+                outfile.write(b"old\n")
+            os.symlink(os.path.abspath(target), link)
+            config.backed_up.pop(link, None)
+
+            save(link)
+            self.assertTrue( os.path.islink(link) )
+            self.assertEqual( os.path.realpath(link), os.path.realpath(target) )
+            with open(target, 'rb') as infile:
+                self.assertEqual( infile.read(), expected )
+        for name in (directory, self.outDirectory):
+            self.assertEqual( glob.glob(os.path.join(name, 'linked.*.tmp')), [] )
+
+    @unittest.skipIf(not hasattr(os, "link") or os.name=="nt", "hard links not supported")
+    def test_atomic_save_hard_links(self):
+        "Test that a file with multiple hard links is overwritten in place and the backup is a copy"
+        filename = os.path.join(self.outDirectory, 'hardlinked.py')
+        other = os.path.join(self.outDirectory, 'hardlinked_other.py')
+        backup_name = filename + config.preferences.backup_suffix
+        for name in (filename, other, backup_name):
+            if os.path.exists(name): os.remove(name)
+        with open(filename, 'wb') as outfile:
+            outfile.write(b"old\n")
+        os.link(filename, other)
+        config.backed_up.pop(filename, None)
+
+        common.save_file(filename, [b"new\n"], 'codegen')
+        self.assertTrue( os.path.samefile(filename, other) )
+        with open(other, 'rb') as infile:
+            self.assertEqual( infile.read(), b"new\n" )
+        self.assertFalse( os.path.samefile(filename, backup_name) )
+        with open(backup_name, 'rb') as infile:
+            self.assertEqual( infile.read(), b"old\n" )
+        self.assertEqual( glob.glob(os.path.join(self.outDirectory, 'hardlinked.py.*.tmp')), [] )
+
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
@@ -0,0 +1,158 @@
+"""
+@copyright: 2020 Dietmar Schwertberger
+
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+
+import testsupport_new  # sets up the path and the translation function _()
+
+import new_properties as np
+import unittest
+
+
+class TestProperties(unittest.TestCase):
+    "Test the property classes and their owners without GUI"
+
+    def test_property_storage(self):
+        "Test that the state of the common properties is stored in slots instead of an instance dict"
+        properties = [np.CheckBoxProperty(False), np.TextPropertyD("", default_value=""), np.CodeProperty(),
+                      np.SpinProperty(0, val_range=(0, 10)), np.ManagedFlags(""), np.ExtraPropertiesProperty()]
+        for prop in properties:
+            self.assertEqual( vars(prop), {}, prop.__class__.__name__ )
+        # editor controls are not created before the property panel is shown
+        self.assertTrue( properties[1].text is None and properties[1].enabler is None )
+        # attributes that are not known in advance are still possible
+        properties[0].deactivated = True
+        self.assertEqual( vars(properties[0]), {"deactivated":True} )
+
+
+    def test_property_access(self):
+        "Test the access to property values via the descriptors installed by PropertyOwner.add_property()"
+        class Owner(np.PropertyOwner):
+            label = "class attribute"
+            def __init__(self, with_size):
+                np.PropertyOwner.__init__(self)
+                self.label = np.TextProperty("label")
+                if with_size: self.size = np.TextProperty("10, 10")
+        owner = Owner(True)
+        self.assertTrue( isinstance(Owner.__dict__["size"], np._PropertyAccess) )
+        self.assertEqual( owner.size, "10, 10" )
+        owner.properties["size"].set("20, 20")
+        self.assertEqual( owner.size, "20, 20" )
+        # class attributes take precedence, as before
+        self.assertEqual( owner.label, "class attribute" )
+        # instances of the same class without the property
+        self.assertFalse( hasattr(Owner(False), "size") )
+
+
+    def test_batched_changes(self):
+        "Test that notifications are deferred and merged by new_properties.batched_changes()"
+        calls = []
+        class Owner(np.PropertyOwner):
+            def __init__(self):
+                np.PropertyOwner.__init__(self)
+                self.label = np.TextProperty("label")
+                self.border = np.SpinProperty(0)
+            def properties_changed(self, modified):
+                calls.append( (self, modified, self.properties["label"].previous_value) )
+        owner1, owner2 = Owner(), Owner()
+        with np.batched_changes():
+            with np.batched_changes():
+                np.notify_changed(owner1, ["label"])
+                np.notify_changed(owner2, ["border"])
+                owner1.properties["border"].previous_value = 1
+                np.notify_changed(owner1, ["border", "label"], owner1.properties["border"])
+            self.assertEqual( calls, [] )
+            label_p = owner2.properties["label"]
+            label_p.previous_value = "old label"
+            np.notify_changed(owner2, ["label"], label_p)
+            label_p.previous_value = None
+        self.assertEqual( calls, [(owner1, ["label", "border"], None), (owner2, ["border", "label"], "old label")] )
+        self.assertEqual( label_p.previous_value, None )
+        # without batch, the owner is notified immediately
+        del calls[:]
+        np.notify_changed(owner1, None)
+        self.assertEqual( calls, [(owner1, None, None)] )
+
+        # on exceptions, the collected changes are discarded
+        del calls[:]
+        with self.assertRaises(ValueError):
+            with np.batched_changes():
+                np.notify_changed(owner1, ["label"])
+                raise ValueError()
+        self.assertEqual( calls, [] )
+        self.assertFalse( np._pending_changes or np._pending_owners or np._pending_layouts )
+        with np.batched_changes():
+            np.notify_changed(owner2, ["label"])
+        self.assertEqual( calls, [(owner2, ["label"], None)] )
+
+
+    def test_editor_reuse(self):
+        "Test that the editor controls are handed over to the same property of another widget"
+        class Control(object):
+            # records the calls from the property instead of displaying
+            value = enabled = None
+            def SetValue(self, value):
+                self.value = value
+            def Enable(self, enable=True):
+                self.enabled = enable
+        class Event(object):
+            skipped = False
+            def Skip(self):
+                self.skipped = True
+        class Owner(np.PropertyOwner):
+            def __init__(self, checked):
+                np.PropertyOwner.__init__(self)
+                self.hidden = np.CheckBoxProperty(checked)
+        prop1 = Owner(False).properties["hidden"]
+        prop2 = Owner(True).properties["hidden"]
+        # this is what CheckBoxProperty.create_editor() does, except for creating controls
+        prop1.checkbox = checkbox = Control()
+        prop1.label_ctrl = Control()
+        on_focus = prop1._new_editor().on_focus
+        prop1.editing = True
+
+        editor = prop1.detach_editor()
+        self.assertTrue( prop1.checkbox is None and not prop1.editing )
+        # while detached, events are not forwarded
+        event = Event()
+        on_focus(event)
+        self.assertTrue( event.skipped and np.current_property is not prop1 )
+
+        self.assertTrue( prop2.attach_editor(editor) )
+        self.assertTrue( prop2.checkbox is checkbox and prop2.editing )
+        self.assertEqual( (checkbox.value, checkbox.enabled), (True, True) )
+        on_focus(Event())
+        self.assertTrue( np.current_property is prop2 )
+
+        # the value range of a spin control is fixed at creation
+        spin1 = np.SpinProperty(0, val_range=(0, 10))
+        spin1.spin = Control()
+        spin1._new_editor()
+        spin1.editing = True
+        editor = spin1.detach_editor()
+        self.assertFalse( np.SpinProperty(0, val_range=(0, 20)).attach_editor(editor) )
+        self.assertTrue( np.SpinProperty(0, val_range=(0, 10)).attach_editor(editor) )
+
+        # the proportion has no editor for items of a GridBagSizer
+        class Sizer(object):
+            _IS_GRIDBAG = False
+        class Item(np.PropertyOwner):
+            def __init__(self, sizer):
+                np.PropertyOwner.__init__(self)
+                self.sizer = sizer
+                self.proportion = np.LayoutProportionProperty(0)
+        gridbag_sizer = Sizer()
+        gridbag_sizer._IS_GRIDBAG = True
+        proportion1 = Item(Sizer()).properties["proportion"]
+        proportion1.spin = Control()
+        proportion1._new_editor()
+        proportion1.editing = True
+        editor = proportion1.detach_editor()
+        self.assertFalse( Item(gridbag_sizer).properties["proportion"].attach_editor(editor) )
+        self.assertTrue( Item(Sizer()).properties["proportion"].attach_editor(editor) )
+
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
@@ -0,0 +1,51 @@
+"""
+@copyright: 2020 Dietmar Schwertberger
+
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+
+from testsupport_new import WXGladeCLITest
+
+import common, profiling, wxglade
+import unittest, json, os
+
+
+class TestProfiling(WXGladeCLITest):
+    "Test the reports of the profiling module"
+
+    def test_profile_startup(self):
+        "Test the report of the startup stages"
+        filename = os.path.join(self.outDirectory, 'startup_profile.json')
+        profiling.startup.enable(filename)
+        try:
+            common.load_config()
+        finally:
+            profiling.startup.finish()
+        with open(filename) as infile:
+            report = json.load(infile)
+        stages = [row["stage"] for row in report]
+        self.assertTrue( "module button.wconfig" in stages )
+        self.assertEqual( [row["total"] for row in report], sorted([row["total"] for row in report], reverse=True) )
+        self.assertFalse( profiling.startup.enabled )
+
+    def test_profile_codegen(self):
+        "Test counting calls and wall time of the widget code writers"
+        filename = os.path.join(self.outDirectory, 'codegen_profile.txt')
+        out_path = os.path.join(self.outDirectory, 'AllWidgets_30_profiled.py')
+        profiling.codegen.enable(filename)
+        try:
+            wxglade._init_guiless_app()
+            self.assertTrue( wxglade._generate_code(self._get_casefile_path('AllWidgets_30.wxg'), "python", out_path) )
+        finally:
+            profiling.codegen.finish(True)
+        self.assertTrue( profiling.codegen.data[("python", "wxButton", "get_code")][0] >= 1 )
+        self.assertTrue( ("python", "", "generate_code") in profiling.codegen.data )
+        # the writers are restored
+        self.assertFalse( "get_code" in common.code_writers["python"].obj_builders["wxButton"].__dict__ )
+        with open(filename) as infile:
+            self.assertTrue( infile.readline().split()[:3] == ["language", "class", "method"] )
+
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
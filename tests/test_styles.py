@@ -0,0 +1,39 @@
+"""
+@copyright: 2020 Dietmar Schwertberger
+
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+
+from testsupport_new import WXGladeCLITest
+
+import common, config, decorators
+import unittest
+
+
+class TestStyles(WXGladeCLITest):
+    "Test the formatting of styles by the widget code writers"
+
+    def test_cn_f_cache(self):
+        "Test that the results of cn_f() are cached per language and discarded with the style definitions"
+        python_writer = common.code_writers["python"].obj_builders["wxButton"]
+        cpp_writer = common.code_writers["C++"].obj_builders["wxButton"]
+        flags = "wxBU_LEFT|wxBU_EXACTFIT"
+        self.assertEqual( python_writer.cn_f(flags), "wx.BU_EXACTFIT | wx.BU_LEFT" )
+        self.assertEqual( cpp_writer.cn_f(flags), "wxBU_EXACTFIT|wxBU_LEFT" )
+        self.assertEqual( python_writer.cn_f(flags), "wx.BU_EXACTFIT | wx.BU_LEFT" )
+
+        # e.g. plugins._process_widget_config() modifies the definitions and clears the caches
+        style_def = config.widget_config["wxButton"]["style_defs"]["wxBU_LEFT"]
+        style_def["rename_to"] = "wxBU_RIGHT"
+        decorators.clear_caches()
+        try:
+            self.assertEqual( python_writer.cn_f(flags), "wx.BU_EXACTFIT | wx.BU_RIGHT" )
+        finally:
+            del style_def["rename_to"]
+            decorators.clear_caches()
+        self.assertEqual( python_writer.cn_f(flags), "wx.BU_EXACTFIT | wx.BU_LEFT" )
+
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
@@ -0,0 +1,287 @@
+"""
+@copyright: 2020 Dietmar Schwertberger
+
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+
+import testsupport_new  # sets up the path and the translation function _()
+
+import compat, tree
+import unittest
+
+
+class _Item(object):
+    "Item of _FakeTreeCtrl"
+    def __init__(self, parent, label=None):
+        self.parent = parent
+        self.label = label
+        self.children = []
+        self.data = None
+        self.expanded = self.has_children = self.deleted = False
+
+    def IsOk(self):
+        return True
+
+
+class _InvalidItem(object):
+    def IsOk(self):
+        return False
+
+
+class _Event(object):
+    def __init__(self, item):
+        self.item = item
+    def GetItem(self):
+        return self.item
+    def Skip(self):
+        pass
+
+
+class _FakeTreeCtrl(object):
+    "Keeps the items in a data structure instead of displaying; the synchronization is taken from tree.WidgetTree"
+    images = {}
+    for name in ("add2", "remove", "refresh", "build", "on_delete_item", "on_expanding", "_get_children_items",
+                 "_is_populated", "_populate", "_ensure_item", "_get_stable_items", "_build_children"):
+        locals()[name] = tree.WidgetTree.__dict__[name]
+    del name
+
+    def __init__(self, root, lazy):
+        self.root = root
+        self.LAZY = lazy
+        self.auto_expand = True
+        self.inserted = self.deleted = 0  # number of calls
+        root.item = self.root_item = _Item(None)
+        root.item.data = root
+
+    # the methods of wx.TreeCtrl that are used by the synchronization
+    def GetRootItem(self):
+        return self.root_item
+
+    def _GetItemData(self, item):
+        return item.data
+
+    def _SetItemData(self, item, data):
+        item.data = data
+
+    def GetFirstChild(self, item):
+        return self.GetNextChild(item, 0)
+
+    def GetNextChild(self, item, cookie):
+        if cookie<len(item.children): return item.children[cookie], cookie+1
+        return _InvalidItem(), cookie
+
+    def GetChildrenCount(self, item, recursively=True):
+        assert not recursively
+        return len(item.children)
+
+    def IsExpanded(self, item):
+        return item.expanded
+
+    def Expand(self, item):
+        if not item.expanded: self.on_expanding(_Event(item))
+        item.expanded = True
+
+    def SetItemHasChildren(self, item, has=True):
+        item.has_children = has
+
+    def SetItemText(self, item, label):
+        item.label = label
+
+    def SetItemImage(self, item, image):
+        pass
+
+    def AppendItem(self, parent, label, image=-1):
+        return self.InsertItemBefore(parent, len(parent.children), label, image)
+
+    def InsertItemBefore(self, parent, index, label, image=-1):
+        self.inserted += 1
+        item = _Item(parent, label)
+        parent.children.insert(index, item)
+        return item
+
+    def Delete(self, item):
+        self.deleted += 1
+        def delete(item):
+            for child_item in item.children:
+                delete(child_item)
+            self.on_delete_item(_Event(item))
+            item.deleted = True
+        delete(item)
+        item.parent.children.remove(item)
+
+
+class _Editor(object):
+    "Widget with the interface that is used by WidgetTree"
+    def __init__(self, name, parent=None, index=None):
+        self.name = name
+        self.parent = parent
+        self.children = []
+        self.item = None
+        if parent is not None:
+            parent.children.insert(len(parent.children) if index is None else index, self)
+
+    def get_all_children(self):
+        return list(self.children)
+
+    def _get_child_pos(self, child):
+        return self.children.index(child)
+
+    def _get_tree_label(self):
+        return self.name
+
+    def _get_tree_image(self):
+        return None
+
+    def __repr__(self):
+        return self.name
+
+
+class TestWidgetTree(unittest.TestCase):
+    "Test the synchronization of the tree items with the widgets, with eager and lazy creation of the items"
+
+    def setUp(self):
+        self._insert_item_before = compat.wx_Tree_InsertItemBefore
+        compat.wx_Tree_InsertItemBefore = _FakeTreeCtrl.InsertItemBefore
+
+    def tearDown(self):
+        compat.wx_Tree_InsertItemBefore = self._insert_item_before
+
+    def _create_tree(self, lazy):
+        "two frames, each with a sizer with five buttons"
+        root = _Editor("application")
+        for t in range(2):
+            frame = _Editor("frame_%d"%t, root)
+            sizer = _Editor("sizer_%d"%t, frame)
+            for n in range(5):
+                _Editor("button_%d_%d"%(t, n), sizer)
+        ctrl = _FakeTreeCtrl(root, lazy)
+        ctrl.auto_expand = False  # as during loading
+        ctrl.build()
+        ctrl.auto_expand = True
+        self._check_items(ctrl, root)
+        return ctrl, root
+
+    def _check_items(self, ctrl, editor):
+        "check that the items match the widgets; in lazy mode, unpopulated items must not have child items"
+        item = editor.item
+        self.assertTrue( item is not None and not item.deleted and item.data is editor, editor )
+        if ctrl._is_populated(editor, item):
+            self.assertEqual( [child_item.data for child_item in item.children], editor.children, editor )
+            for child in editor.children:
+                self._check_items(ctrl, child)
+        else:
+            self.assertEqual( item.has_children, bool(editor.children), editor )
+            editors = list(editor.children)
+            while editors:
+                child = editors.pop()
+                self.assertTrue( child.item is None, child )
+                editors.extend(child.children)
+
+    def _get_sizers(self, ctrl, root):
+        "returns the sizers of the two frames; in lazy mode, only the items of the first one are created"
+        sizers = [frame.children[0] for frame in root.children]
+        ctrl.Expand( ctrl._ensure_item(sizers[0]) )
+        if ctrl.LAZY:
+            self.assertTrue( sizers[1].item is None )
+        self._check_items(ctrl, root)
+        return sizers
+
+    def test_lazy(self):
+        "Test that the items are created when they are expanded or required"
+        ctrl, root = self._create_tree(lazy=True)
+        self.assertEqual( ctrl.inserted, 2 )
+        self.assertTrue( root.children[0].item.has_children and not root.children[0].item.children )
+        button = root.children[1].children[0].children[3]
+        item = ctrl._ensure_item(button)
+        self.assertTrue( item is not None and item.data is button )
+        self.assertEqual( ctrl.inserted, 2+1+5 )
+        self._check_items(ctrl, root)
+
+        ctrl, root = self._create_tree(lazy=False)
+        self.assertEqual( ctrl.inserted, 2*(1+1+5) )
+
+    def test_reorder(self):
+        "Test that moving a child moves only its item"
+        for lazy in (False, True):
+            ctrl, root = self._create_tree(lazy)
+            for sizer in self._get_sizers(ctrl, root):
+                items = [child.item for child in sizer.children]
+                inserted, deleted = ctrl.inserted, ctrl.deleted
+                moved = sizer.children.pop(3)
+                sizer.children.insert(1, moved)
+                ctrl.build(sizer)
+                self._check_items(ctrl, root)
+                if sizer.item is None or not sizer.item.children: continue  # not populated in lazy mode
+                self.assertEqual( (ctrl.inserted-inserted, ctrl.deleted-deleted), (1, 1), lazy )
+                for child in sizer.children:
+                    if child is not moved: self.assertTrue( child.item in items, child )
+
+            # reverse the order of the toplevel items
+            root.children.reverse()
+            ctrl.build()
+            self._check_items(ctrl, root)
+
+    def test_insert(self):
+        "Test that inserting a child keeps the existing items"
+        for lazy in (False, True):
+            ctrl, root = self._create_tree(lazy)
+            for sizer in self._get_sizers(ctrl, root):
+                items = [child.item for child in sizer.children]
+                inserted, deleted = ctrl.inserted, ctrl.deleted
+                button = _Editor("button_new", sizer, 2)
+                ctrl.build(button)
+                self._check_items(ctrl, root)
+                self.assertEqual( ctrl.deleted, deleted )
+                if sizer.item is None or not sizer.item.children: continue  # not populated in lazy mode
+                self.assertEqual( ctrl.inserted-inserted, 1 )
+                self.assertEqual( [child.item for child in sizer.children if child is not button], items )
+
+            # a sizer with children
+            sizer = _Editor("sizer_new", root.children[0], 0)
+            _Editor("button_new", sizer)
+            ctrl.build(sizer)
+            self._check_items(ctrl, root)
+
+    def test_remove(self):
+        "Test that removing a child deletes only its item"
+        for lazy in (False, True):
+            ctrl, root = self._create_tree(lazy)
+            for sizer in self._get_sizers(ctrl, root):
+                items = [child.item for child in sizer.children]
+                inserted, deleted = ctrl.inserted, ctrl.deleted
+                button = sizer.children.pop(2)
+                ctrl.remove(button)  # as from EditBase.recursive_remove()
+                ctrl.build(sizer)
+                self._check_items(ctrl, root)
+                self.assertEqual( ctrl.inserted, inserted )
+                if sizer.item is None or not sizer.item.children: continue  # not populated in lazy mode
+                self.assertEqual( ctrl.deleted-deleted, 1 )
+                self.assertEqual( [child.item for child in sizer.children], items[:2]+items[3:] )
+
+            # the sizer with its children
+            frame = root.children[0]
+            frame.children.remove( frame.children[0] )
+            ctrl.build(frame)
+            self._check_items(ctrl, root)
+
+    def test_replace(self):
+        "Test that the item of a replaced child is re-used, e.g. when a slot is replaced with a widget"
+        for lazy in (False, True):
+            ctrl, root = self._create_tree(lazy)
+            for sizer in self._get_sizers(ctrl, root):
+                item = sizer.children[2].item
+                inserted, deleted = ctrl.inserted, ctrl.deleted
+                ctrl.remove(sizer.children[2])
+                button = sizer.children[2] = _Editor("button_new")
+                button.parent = sizer
+                ctrl.build(button)
+                self._check_items(ctrl, root)
+                self.assertEqual( (ctrl.inserted, ctrl.deleted), (inserted, deleted) )
+                if item is None: continue  # not populated in lazy mode
+                self.assertTrue( button.item is item )
+                self.assertEqual( item.label, "button_new" )
+
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
@@ -177,12 +177,18 @@ class WXGladeBaseTest(unittest.TestCase):
 
 
 class WXGladeCLITest(WXGladeBaseTest):
+    _initialised = False  # the code writers are module globals; they can't be copied again after generating code
+
     @classmethod
     def setUpClass(cls):
         logging.disable(logging.WARNING)
+        common.app_tree = None  # no GUI state, e.g. left over from GUI tests
+        if not os.path.exists(cls.outDirectory): os.mkdir(cls.outDirectory)
+        if WXGladeCLITest._initialised: return
         wxglade.init_stage1(options=None)
         #wxglade.init_localization()
         wxglade.init_stage2(False)
+        WXGladeCLITest._initialised = True
 
     def generate(self, basename, excluded=None, included=None):
         "Load a wxGlade document 'basename' and generate code for all languages except the ones in list 'excluded'"
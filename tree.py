@@ -7,9 +7,9 @@ Classes to handle and display the structure of a wxGlade app
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import os.path
+import os.path, bisect
 import wx
-import misc, common, compat, config, clipboard
+import misc, common, compat, config, clipboard, profiling
 
 DEBUG = config.debugging and False
 if DEBUG:
@@ -18,6 +18,7 @@ if DEBUG:
 class WidgetTree(wx.TreeCtrl):#, Tree):
     "Tree with the ability to display the hierarchy of widgets"
     images = {} # Dictionary of icons of the widgets displayed
+    LAZY = True  # create child items only when an item is expanded or a child is selected
     def __init__(self, parent, application):
         style = wx.TR_DEFAULT_STYLE|wx.TR_HAS_VARIABLE_ROW_HEIGHT
         style |= wx.TR_EDIT_LABELS
@@ -26,7 +27,8 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
         wx.TreeCtrl.__init__(self, parent, -1, style=style)
         self.cur_widget = None  # reference to the selected widget
         self.root = application
-        self._load_images()
+        with profiling.startup.measure("WidgetTree._load_images"):
+            self._load_images()
         application.item = self.AddRoot(_('Application'), 0)
         self._SetItemData(application.item, application)
         self.skip_select = 0  # avoid an infinite loop on win32, as SelectItem fires an EVT_TREE_SEL_CHANGED event
@@ -51,6 +53,7 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
         self.Bind(wx.EVT_KEY_DOWN, self.on_key_down_event)
         #self.Bind(wx.EVT_CHAR_HOOK, self.on_char)  # on wx 2.8 the event will not be delivered to the child
         self.Bind(wx.EVT_TREE_DELETE_ITEM, self.on_delete_item)
+        self.Bind(wx.EVT_TREE_ITEM_EXPANDING, self.on_expanding)
 
     def _load_images(self):
         image_list = wx.ImageList(21, 21)
@@ -323,7 +326,7 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
         editor = self._GetItemData( item )
         if DEBUG:
             print("on_delete_item", utilities.hx(item), editor, editor and editor.item or None)
-        if editor is not None and editor.item is item:
+        if editor is not None and editor.item==item:
             editor.item = None
 
     def _get_children_items(self, item):
@@ -334,69 +337,124 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
             child_item, cookie = self.GetNextChild(item, cookie)
         return items
 
-    def _build_children(self, editor, item, recursive=True):
-        # XXX a better algorithm would be nice
-        # currently it's checked from the start and from the end how many are matching; all inbetween are replaced
+    def _is_populated(self, editor, item):
+        # in lazy mode, child items are only created when the item is expanded or a child is to be selected
+        if not self.LAZY or editor is self.root: return True
+        return self.IsExpanded(item) or self.GetChildrenCount(item, False)>0
+
+    def _populate(self, editor):
+        "create the child items of editor; the grand children will be created when the child items are expanded"
+        if editor.item is None or self.GetChildrenCount(editor.item, False): return
+        if DEBUG: print("_populate", editor)
+        auto_expand, self.auto_expand = self.auto_expand, False
+        try:
+            self._build_children(editor, editor.item, populate=True)
+        finally:
+            self.auto_expand = auto_expand
+
+    def _ensure_item(self, editor):
+        "create the items of editor and its parents, if they have been left out in lazy mode; returns editor.item"
+        if editor.item is None and editor.parent is not None and self._ensure_item(editor.parent) is not None:
+            self._populate(editor.parent)
+        return editor.item
+
+    def on_expanding(self, event):
+        # lazy mode: create the child items now
+        editor = self._GetItemData( event.GetItem() )
+        if editor is not None: self._populate(editor)
+        event.Skip()
+
+    def _get_stable_items(self, item_editors, positions):
+        # returns the indices of the items to be kept in place: the longest sequence of items which are already
+        # in the order of the children (longest increasing subsequence of the child positions)
+        indices = []  # indices[n]: index of the smallest item ending a sequence of length n+1
+        tails = []    # the corresponding child positions
+        previous = [None]*len(item_editors)
+        for i, child in enumerate(item_editors):
+            if child is None: continue
+            pos = positions[id(child)]
+            n = bisect.bisect_left(tails, pos)
+            if n: previous[i] = indices[n-1]
+            if n==len(tails):
+                tails.append(pos)
+                indices.append(i)
+            else:
+                tails[n] = pos
+                indices[n] = i
+        ret = []
+        i = indices[-1] if indices else None
+        while i is not None:
+            ret.append(i)
+            i = previous[i]
+        ret.reverse()
+        return ret
+
+    def _build_children(self, editor, item, recursive=True, populate=False):
+        # synchronize the child items with the children of editor; items are matched by their editors:
+        # the longest sequence of items in the right order is kept, moved items are deleted and re-inserted,
+        # items of removed children are re-used in place or deleted
         if DEBUG: print("_build_children", editor)
         children = editor.get_all_children()
-        items = self._get_children_items(editor.item)
+        if not populate and not self._is_populated(editor, item):
+            # lazy mode: the child items will be created when the item is expanded
+            self.SetItemHasChildren(item, bool(children))
+            return
+        items = self._get_children_items(item)
         if DEBUG: print("children", children)
         if DEBUG: print("items", items)
+        positions = dict( (id(child), pos) for pos, child in enumerate(children) )
         item_editors = []
         for child_item in items:
             child = self._GetItemData(child_item)
-            if child is not None and (not children or not child in children):
+            if child is not None and id(child) in positions and child.item is None:
+                child.item = child_item
+            if child is not None and (id(child) not in positions or child.item!=child_item):
+                # not a child any more or there's another item for the child already
                 self._SetItemData(child_item, None)
-                if child.item is child_item:
-                    if DEBUG: print("removed child.item", utilities.hx(child), utilities.hx(child.item))
-                    child.item = None  # is probably None already
-                item_editors.append(None)
-            else:
-                item_editors.append(child)
+                if child.item==child_item: child.item = None
+                child = None
+            item_editors.append(child)
         if DEBUG: print("item_editors", item_editors)
         if DEBUG: print()
-        match_beginning = 0
-        for c,child in enumerate(children):
-            if c<len(item_editors) and item_editors[c] is child:
-                match_beginning = c+1
-            else:
-                break
-        match_end = 0
-        c = -1
-        while match_beginning+match_end<len(children):
-            if match_end<len(item_editors) and item_editors[c] is children[c]:
-                match_end += 1
-            else:
-                break
-            c -= 1
-
-        if len(children) > len(item_editors):
-            # insert or add items, right after match_beginning
-            for n in range( len(children) - len(item_editors) ):
-                index = match_beginning + n
-                child = children[index]
-                item = self.add2(child, parent=editor, index=index)
-                items.insert(index, item)
-        elif len(children) < len(item_editors):
-            # remove items, right after match_beginning
-            for n in range( len(item_editors) - len(children) ):
-                index = match_beginning 
-                child_item = items[index]
+
+        stable = set( self._get_stable_items(item_editors, positions) )
+        expanded = set()  # moved children with expanded items; these will be expanded again
+        for n, child in enumerate(item_editors):
+            if child is None or n in stable: continue
+            if self.IsExpanded(items[n]): expanded.add(id(child))
+            self._SetItemData(items[n], None)
+            child.item = None
+            self.Delete(items[n])
+            items[n] = None
+        item_editors = [child for n, child in enumerate(item_editors) if items[n] is not None]
+        items = [child_item for child_item in items if child_item is not None]
+
+        # walk through the gaps between the kept items; all items in the gaps are without editor
+        child_items = []
+        i = c = 0  # index in items and in children
+        for item_index in [n for n, child in enumerate(item_editors) if child is not None] + [len(items)]:
+            child_index = positions[id(item_editors[item_index])]  if item_index<len(items) else  len(children)
+            old = items[i:item_index]
+            for n, child in enumerate(children[c:child_index]):
+                child_items.append( self.add2(child, editor, len(child_items), item=old[n] if n<len(old) else None) )
+            for child_item in old[child_index-c:]:
                 self.Delete(child_item)
-                del items[match_beginning]
-        if match_beginning+match_end<len(children):
-            # length matches, re-use item in the middle
-            for index in range(match_beginning, len(children)-match_end):
-                child = children[index]
-                item = self.add2(child, parent=editor, index=index, item=items[index])
-        
+            if item_index<len(items):
+                child_items.append(items[item_index])
+            i = item_index + 1
+            c = child_index + 1
+        if not children: self.SetItemHasChildren(item, False)
+
         if not recursive:
             # update labels and images, called e.g. when notebook pages change
-            for child in children:
+            for child, child_item in zip(children, child_items):
                 self.refresh(child)
+                if not self.GetChildrenCount(child_item, False):
+                    self.SetItemHasChildren(child_item, bool(child.get_all_children()))
             return
-        for child, item in zip(children, items):
-            self._build_children(child, item)
+        for child, child_item in zip(children, child_items):
+            self._build_children(child, child_item, populate=id(child) in expanded)
+            if id(child) in expanded: self.Expand(child_item)
 
     def build(self, editor=None, recursive=True, freeze=False):
         if DEBUG:
@@ -480,7 +538,7 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
 
     def set_current_widget(self, editor):
         # interface from common.set_focused_widget
-        if editor is None or editor is self.cur_widget or editor.item is None: return
+        if editor is None or editor is self.cur_widget or self._ensure_item(editor) is None: return
         self.skip_select = True
         self.SelectItem(editor.item)
         if not self.IsExpanded(editor.item) and (not hasattr(self, "HasFocus") or not self.HasFocus()):
@@ -626,6 +684,7 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
 
     def change_item_editor(self, old, new, keep_children=False):
         # called from edit_sizers.change_sizer
+        if old.item is None: return
         self._SetItemData(old.item, new)
         new.item = old.item
         old.item = None
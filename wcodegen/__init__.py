@@ -8,14 +8,51 @@ Common code used by all widget code generators
 
 from __future__ import absolute_import
 
-import common, config, misc, compat
+import common, config, misc, compat, decorators
 import new_properties as np
 
-import copy, logging, os.path
+import copy, logging, os.path, re
 from .dialogs import *
 from gui_mixins import StylesMixin
 
 
+_rec_template_field = re.compile(r'%\((\w+)\)s')
+
+@decorators.lru_cache(512)
+def get_template_fields(tmpl):
+    "Return the names of the '%(name)s' fields of the template string as frozenset"
+    return frozenset( _rec_template_field.findall(tmpl) )
+
+
+class TemplateDict(dict):
+    """Values for the template fields; see BaseWidgetWriter.tmpl_dict
+
+    Values of fields that were registered using set_lazy() are calculated on first access, e.g. when a template is
+    formatted with this dict. So only the fields that are used by the templates need to be calculated."""
+    def __init__(self):
+        dict.__init__(self)
+        self._lazy = {}
+
+    def set_lazy(self, name, function, *args):
+        "Register function(*args) to calculate the value of the named field"
+        self.pop(name, None)
+        self._lazy[name] = (function, args)
+
+    def __missing__(self, name):
+        function, args = self._lazy.pop(name)  # KeyError if unknown
+        value = self[name] = function(*args)
+        return value
+
+    def __contains__(self, name):
+        return dict.__contains__(self, name) or name in self._lazy
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+
 class BaseCodeWriter(object):
     "Base for all code writer classes"
     def __init__(self):
@@ -348,6 +385,9 @@ class BaseWidgetWriter(StylesMixin, BaseCodeWriter):
         self.codegen = common.code_writers[self.language]
         self._reset_vars()
 
+        # names of the fields of the main template; see get_code()
+        self.tmpl_fields = get_template_fields(self.tmpl) if self.tmpl else frozenset()
+
     def format_widget_access(self, obj):
         return self.codegen.format_generic_access(obj)
 
@@ -368,7 +408,7 @@ class BaseWidgetWriter(StylesMixin, BaseCodeWriter):
         self.tmpl_after = []
         self.tmpl_layout = []
         self.tmpl_props = []
-        self.tmpl_dict = {}
+        self.tmpl_dict = TemplateDict()
 
     def _prepare_style(self, style):
         "Process and format style string with cn_f(); returns string; see _prepare_tmpl_content(), tmpl_flags"
@@ -394,20 +434,21 @@ class BaseWidgetWriter(StylesMixin, BaseCodeWriter):
         return style
 
     def _prepare_tmpl_content(self, obj):
-        "Prepare and set template variables; obj is instance of xml_parse.CodeObject; returns dict"
+        """Prepare and set template variables; obj is instance of xml_parse.CodeObject; returns dict
+        Values that are not always required are calculated only when used; see TemplateDict"""
         self.tmpl_dict['comment'] = self.codegen.comment_sign
         self.tmpl_dict['tab'] = self.codegen.tabs(1)
-        self.tmpl_dict['store_as_attr'] = self.codegen.store_as_attr(obj)
         self.tmpl_dict['id_name'], self.tmpl_dict['id_number'] = self.codegen.generate_code_id(obj)
         self.tmpl_dict['id'] = self.tmpl_dict['id_number']
-        self.tmpl_dict['obj_name'] = self.codegen._format_name(obj.name)
-        self.tmpl_dict['klass'] = obj.get_instantiation_class(self.cn, self.cn_class, self.codegen.preview)
-        self.tmpl_dict['store_as_attr'] = self.codegen.store_as_attr(obj)
+        self.tmpl_dict.set_lazy('store_as_attr', self.codegen.store_as_attr, obj)
+        self.tmpl_dict.set_lazy('obj_name', self.codegen._format_name, obj.name)
+        self.tmpl_dict.set_lazy('klass', obj.get_instantiation_class, self.cn, self.cn_class, self.codegen.preview)
 
-        if obj.check_prop('style'): self.tmpl_dict['style'] = self._prepare_style(obj.properties["style"])
+        if obj.check_prop('style'): self.tmpl_dict.set_lazy('style', self._prepare_style, obj.properties["style"])
         if obj.check_prop('label'):
-            self.tmpl_dict['label'] = self.codegen.quote_str( obj.label )
-        if obj.check_prop('value'): self.tmpl_dict['value'] = self.codegen.quote_str( compat.unicode(obj.value) )
+            self.tmpl_dict.set_lazy('label', self.codegen.quote_str, obj.label)
+        if obj.check_prop('value'):
+            self.tmpl_dict.set_lazy('value', self.codegen.quote_str, compat.unicode(obj.value))
         if obj.check_prop('value_unquoted'): self.tmpl_dict['value_unquoted'] = obj.value
 
         return
@@ -432,7 +473,7 @@ class BaseWidgetWriter(StylesMixin, BaseCodeWriter):
             value = p.get_value()
             if value.startswith('art:'): need_artprovider = True
             self.tmpl_dict[p_name] = self.generate_code_bitmap(value)
-            if '%%(%s)s'%p_name in self.tmpl:
+            if p_name in self.tmpl_fields:
                 # constructor argument
                 have_constructor_argument = True
             elif value and (not p.min_version or self.codegen.for_version>=p.min_version):
@@ -527,7 +568,7 @@ class BaseWidgetWriter(StylesMixin, BaseCodeWriter):
         self._prepare_tmpl_content(obj)
 
         # generate choices automatically if the template contains '%(choices)s' or '%(choices_len)s'
-        if '%(choices)s' in self.tmpl or '%(choices_len)s' in self.tmpl:
+        if 'choices' in self.tmpl_fields or 'choices_len' in self.tmpl_fields:
             self._prepare_choice(obj)
 
         # generate wxBitmap code
@@ -600,11 +641,7 @@ class BaseWidgetWriter(StylesMixin, BaseCodeWriter):
                                {'name':obj.name,'klass': obj.klass, 'events':events})
             return ret
 
-        try:
-            default_event = self.config['events']['default']['type']
-        except KeyError:
-            default_event = 'wxCommandEvent'
-
+        event_types, default_type = self._get_event_types(self.codegen.for_version)
         for event, handler in sorted( events ):
             if not handler: continue
 
@@ -612,32 +649,35 @@ class BaseWidgetWriter(StylesMixin, BaseCodeWriter):
                 if self.codegen.language!='python': continue
                 handler = "lambda event: print('event handler: lambda function')"
 
-            major = 'wx%d' % self.codegen.for_version[0]
-            detailed = 'wx%d%d' % self.codegen.for_version
-            try:
-                supported_by = self.config['events'][event]['supported_by']
-                if not (major in supported_by or detailed in supported_by):
-                    continue
-            except (AttributeError, KeyError):
-                pass
-
-            # check for specific event type
-            type_generic = 'type_%s' % major
-            try:
-                evt_type = self.config['events'][event][type_generic]
-                ret.append((obj, event, handler, evt_type))
-                continue
-            except KeyError:
-                pass
-
-            # check for generic event type
-            try:
-                evt_type = self.config['events'][event]['type']
-            except KeyError:
-                evt_type = default_event
+            evt_type = event_types.get(event, default_type)
+            if evt_type is None: continue  # not supported by this wx version
             ret.append((obj, event, handler, evt_type))
         return ret
 
+    @decorators.lru_cache(256)
+    def _get_event_types(self, for_version):
+        """Return a dict mapping the configured event names to their event types for the wx version
+        and the default event type for events that are not configured.
+        The event type is None if the event is not supported by this wx version."""
+        major = 'wx%d' % for_version[0]
+        detailed = 'wx%d%d' % for_version
+        type_major = 'type_%s' % major
+        events = self.config['events']
+        default_type = events.get('default', {}).get('type', 'wxCommandEvent')
+
+        ret = {}
+        for event, details in events.items():
+            supported_by = details.get('supported_by')
+            if supported_by is not None and not (major in supported_by or detailed in supported_by):
+                ret[event] = None
+            elif type_major in details:
+                # specific event type
+                ret[event] = details[type_major]
+            else:
+                # generic event type
+                ret[event] = details.get('type', default_type)
+        return ret, default_type
+
     def get_properties_code(self, obj):
         """Generates language specific code to set properties for the wxWidget object from a template
         by filling variables generated by _prepare_tmpl_content(); returns list of strings; see tmpl_props"""
@@ -7,7 +7,7 @@ A class to represent a menu on a wxMenuBar
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-from common import format_xml_tag
+from common import format_xml_tag, format_xml_start_tag, format_xml_end_tag
 import compat
 
 __all__ = ['MenuTree']
@@ -67,10 +67,10 @@ class MenuTree(object):
                 if self.handler:
                     attrs[u'handler'] = self.handler
                 attrs[u'label'] = self.label
-                inner_xml = []
+                output.append( format_xml_start_tag(u'menu', tabs, **attrs) )
                 for c in self.children:
-                    c.write(inner_xml, tabs + 1)
-                output.extend( format_xml_tag( u'menu', inner_xml, tabs, is_xml=True, **attrs ) )
+                    c.write(output, tabs + 1)
+                output.append( format_xml_end_tag(u'menu', tabs) )
 
     #end of class Node
 
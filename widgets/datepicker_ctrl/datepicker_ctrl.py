@@ -38,7 +38,7 @@ class EditDatePickerCtrl(ManagedBase, EditStylesMixin):
         self.widget = DatePickerCtrl(self.parent_window.widget, self.id, style=self.style)
 
     # handle compatibility:
-    @decorators.memoize
+    @decorators.lru_cache(ignore_self=True)
     def wxname2attr(self, name):
         cn = self.codegen.get_class(self.codegen.cn(name))
         module = wx if compat.IS_CLASSIC else wx.adv
@@ -46,6 +46,10 @@ class AffirmativePropertyD(np.ListBoxPropertyD):
             self.value = buttons[0]  if buttons else  ""
         super(AffirmativePropertyD, self).create_editor(panel, sizer)
 
+    def _get_editor_key(self):
+        # the choices are collected by create_editor()
+        return None
+
 
 class EditDialog(BitmapMixin, TopLevelBase, EditStylesMixin):
     WX_CLASS = "wxDialog"
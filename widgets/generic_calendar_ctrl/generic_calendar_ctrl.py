@@ -41,7 +41,7 @@ class EditGenericCalendarCtrl(ManagedBase, EditStylesMixin):
         self.widget = GenericCalendarCtrl(self.parent_window.widget, self.id, style=self.style)
 
     # handle compatibility:
-    @decorators.memoize
+    @decorators.lru_cache(ignore_self=True)
     def wxname2attr(self, name):
         assert name.startswith('wx')
 
@@ -60,7 +60,7 @@ class EditHyperlinkCtrl(ManagedBase, EditStylesMixin):
         ManagedBase.properties_changed(self, modified)
 
     # handle compatibility:
-    @decorators.memoize
+    @decorators.lru_cache(ignore_self=True)
     def wxname2attr(self, name):
         cn = self.codegen.get_class(self.codegen.cn(name))
         module = wx if compat.IS_CLASSIC else wx.adv
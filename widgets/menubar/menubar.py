@@ -643,10 +643,10 @@ class MenuProperty(np.Property):
         dialog.Destroy()
 
     def write(self, output, tabs):
-        inner_xml = []
+        output.append( common.format_xml_start_tag(u'menus', tabs) )
         for menu in self.get():
-            menu.write(inner_xml, tabs+1)
-        output.extend( common.format_xml_tag( u'menus', inner_xml, tabs, is_xml=True ) )
+            menu.write(output, tabs+1)
+        output.append( common.format_xml_end_tag(u'menus', tabs) )
 
 
 class MenuHandler(BaseXmlBuilderTagHandler):
@@ -10,7 +10,7 @@ Entry point of wxGlade
 
 import atexit
 import codecs
-import logging, os, sys, gettext, optparse
+import glob, logging, os, sys, gettext, optparse, time
 
 # Use a NullWriter with Unicode support (encoding attribute) to catch and
 # drop all output in PyInstaller environment (standalone Edition)
@@ -44,7 +44,7 @@ def my_displayhook(value):
 sys.displayhook = my_displayhook
 
 
-import common, config, compat, log
+import common, config, compat, log, profiling
 
 
 def parse_command_line():
@@ -63,6 +63,7 @@ def parse_command_line():
                 "             <http://www.opensource.org/licenses/mit-license.php>") % config.get_version()
     usage = _("Usage: wxglade <WXG File>             start the wxGlade GUI\n"
               " or:   wxglade <Options> <WXG File>   generate code from command line\n"
+              " or:   wxglade <Options> <WXG Files>  generate code for several files in one run\n"
               " or:   wxglade --version              show programs version number and exit\n"
               " or:   wxglade -h|--help              show this help message and exit")
     parser = optparse.OptionParser( add_help_option=False, version=version, usage=usage )
@@ -74,9 +75,21 @@ def parse_command_line():
     parser.add_option("-o", "--output", metavar="PATH", dest="output",
                             help=_("(optional) output file in single-file mode or output directory in multi-file mode"))
 
+    parser.add_option("-j", "--jobs", type="int", metavar="N", dest="jobs", default=1,
+                            help=_("(optional) number of processes to generate code for several wxg files in "
+                                   "parallel; 0 for the number of CPUs") )
+
     parser.add_option("-c", "--use-config", dest="rc_file",
                             help=_("use specified wxgladerc config file instead of the default one") )
 
+    parser.add_option("--profile-startup", metavar="FILE", dest="profile_startup",
+                            help=_("write the wall times of the startup stages to FILE; "
+                                   "the format is JSON if FILE ends with .json, text otherwise") )
+
+    parser.add_option("--profile-codegen", metavar="FILE", dest="profile_codegen",
+                            help=_("write calls and wall times of the widget code writers per language, class and "
+                                   "method to FILE; the format is JSON if FILE ends with .json, text otherwise") )
+
     options, args = parser.parse_args()
 
     # print epilog because OptionParser.epilog isn't available to Python 2.3
@@ -84,6 +97,9 @@ def parse_command_line():
         parser.print_help()
         print( _( "Example: Generate Python code out of myapp.wxg\n\n"
                   "   wxglade -o output.py -g python myapp.wxg\n\n"
+                  "Example: Generate Python code for many projects; a file name starting with '@' is\n"
+                  "         a manifest file with one wxg file name per line\n\n"
+                  "   wxglade -g python ui/*.wxg @more_projects.txt\n\n"
                   "Report bugs to:    <wxglade-general@lists.sourceforge.net> or at\n"
                   "                   <https://sourceforge.net/projects/wxglade/>\n"
                   "wxGlade home page: <http://wxglade.sourceforge.net/>") )
@@ -92,34 +108,36 @@ def parse_command_line():
     # Make an absolute version of path.
     # According to the invoking dir of wxGlade (which can be different
     # from '.' if it is invoked from a shell script).
-    if len(args) == 1:
-        filename = args[0]
-        if filename.startswith("file://"): filename = filename[7:]
-        if not os.path.isabs(filename):
-            filename = os.path.join(os.getcwd(), filename)
-        filename = os.path.normpath(os.path.expanduser(filename))
-        options.filename = filename
+    filenames = _expand_filenames(args)
+    if len(filenames) == 1:
+        options.filename = filenames[0]
     else:
         options.filename = None
+    options.filenames = filenames
 
     # check parameters
     #  - language
     #     - one file            -> cmdline code generation
-    #     - no / > one files    -> usage
+    #     - more files          -> cmdline code generation in batch mode
+    #     - no files            -> usage
     #  - no language            -> start gui
     if options.language:
-        if len(args) == 1:
-            options.start_gui = False
-        elif len(args) == 0:
+        if len(filenames) == 0:
             msg = _("No wxg file given.\n")
             logging.error(msg)
             parser.print_help()
             sys.exit(msg)
-        else:
-            msg = _("Too many wxg files given.\n")
+        elif len(filenames) > 1 and options.output:
+            msg = _("Option -o/--output can only be used with a single wxg file.\n")
             logging.error(msg)
             parser.print_help()
             sys.exit(msg)
+        if options.jobs < 0:
+            msg = _("Option -j/--jobs must not be negative.\n")
+            logging.error(msg)
+            parser.print_help()
+            sys.exit(msg)
+        options.start_gui = False
     else:
         options.start_gui = True
 
@@ -130,6 +148,43 @@ def parse_command_line():
     return options
 
 
+def _expand_filenames(args):
+    """Return a list of absolute file names for the given command line arguments.
+    Arguments with wildcards are expanded; an argument '@<file>' is a manifest file with one wxg file per line.
+    Empty lines and lines starting with '#' are ignored in manifest files."""
+    filenames = []
+    for arg in args:
+        if arg.startswith("file://"): arg = arg[7:]
+        if arg.startswith("@"):
+            manifest = os.path.normpath( os.path.expanduser(arg[1:]) )
+            try:
+                with open(manifest) as infile:
+                    lines = [line.strip() for line in infile]
+            except EnvironmentError as details:
+                msg = _("Can't read manifest file %s: %s\n") % (manifest, details)
+                logging.error(msg)
+                sys.exit(msg)
+            # relative names in a manifest are relative to the manifest
+            base = os.path.dirname( os.path.abspath(manifest) )
+            names = [os.path.join(base, os.path.expanduser(line)) for line in lines if line and line[0]!="#"]
+        else:
+            names = [arg]
+
+        for name in names:
+            name = os.path.expanduser(name)
+            if "*" in name or "?" in name or "[" in name:
+                matches = sorted( glob.glob(name) )
+                if not matches:
+                    logging.warning( _('No wxg file matches "%s"'), name )
+            else:
+                matches = [name]
+            for filename in matches:
+                if not os.path.isabs(filename):
+                    filename = os.path.join(os.getcwd(), filename)
+                filenames.append( os.path.normpath(filename) )
+    return filenames
+
+
 def command_line_code_generation(filename, language, out_path=None):
     """Starts a code generator without starting the GUI.
 
@@ -252,12 +307,8 @@ def _guiless_open_app(filename):
 
     
 
-def command_line_code_generation(filename, language, out_path=None):
-    """Starts a code generator without starting the GUI.
-
-    filename: Name of wxg file to generate code from
-    language: Code generator language
-    out_path: output file / output directory"""
+def _init_guiless_app():
+    "Create the Application instance for code generation without GUI; returns the new common.root"
     import application, tree
     # Instead of instantiating a main.wxGlade() object, that is
     # derived from wx.App, we must do the equivalent work.  The
@@ -265,17 +316,20 @@ def command_line_code_generation(filename, language, out_path=None):
     # main.wxGladeFrame.__init__()
     common.init_preferences()
     common.root = app = application.Application()
+    return app
+
 
-    # Now we can load the file
-    if filename is not None:
-        b = _guiless_open_app(filename)
-        if not b:
-            sys.exit(1)
+def _generate_code(filename, language, out_path=None):
+    """Load the wxg file into common.root and generate the code; returns True if successful.
+    common.root is cleared and re-initialised before loading, so it can be called repeatedly."""
     try:
+        # Now we can load the file
+        if filename is not None and not _guiless_open_app(filename):
+            return False
         if language not in common.code_writers:
             raise ValueError('Code writer for "%s" is not available.'%language)
         common.root.properties["language"].set(language)
-        common.root.generate_code(out_path=out_path)
+        return common.root.generate_code(out_path=out_path) or False
     #except errors.WxgBaseException as inst:
         #if config.debugging: raise
         #logging.error(inst)
@@ -285,11 +339,81 @@ def command_line_code_generation(filename, language, out_path=None):
         logging.error( _("An exception occurred while generating the code for the application.\n"
                          "If you think this is a wxGlade bug, please report it.") )
         logging.exception(_('Internal Error'))
+        return False
+
+
+def command_line_code_generation(filename, language, out_path=None):
+    """Starts a code generator without starting the GUI.
+
+    filename: Name of wxg file to generate code from
+    language: Code generator language
+    out_path: output file / output directory"""
+    _init_guiless_app()
+    if not _generate_code(filename, language, out_path):
         sys.exit(1)
     if not config.testing:
         sys.exit(0)
 
 
+def _init_batch_worker(rc_file):
+    "Initialise a worker process of command_line_batch_code_generation()"
+    if not common.code_writers:
+        # the process was spawned, not forked: initialise like run_main()
+        init_stage1( optparse.Values({"rc_file": rc_file}) )
+        init_stage2(False)
+    # each process has its own common.root and code writers
+    _init_guiless_app()
+
+
+def _batch_generate_code(args):
+    "Generate code for one file of command_line_batch_code_generation(); returns (filename, success, duration)"
+    filename, language = args
+    start = time.time()
+    success = _generate_code(filename, language)
+    return filename, success, time.time()-start
+
+
+def command_line_batch_code_generation(filenames, language, jobs=1):
+    """Generate code for several wxg files without starting the GUI.
+
+    Code generators, widgets and sizers are loaded only once per process; common.root is re-used for all files.
+    The output path is taken from each project.
+    Logs the status and the duration for each file and a summary.
+
+    filenames: Names of wxg files to generate code from
+    language:  Code generator language
+    jobs:      Number of processes to use; 0 for the number of CPUs
+
+    returns a list of (filename, success, duration) tuples if config.testing is set; otherwise it exits"""
+    import multiprocessing
+    if jobs <= 0:
+        jobs = multiprocessing.cpu_count()
+    jobs = min(jobs, len(filenames))
+
+    start = time.time()
+    tasks = [(filename, language) for filename in filenames]
+    if jobs > 1:
+        # common.root and the code writers are global: each worker process generates one project at a time
+        pool = multiprocessing.Pool( jobs, _init_batch_worker, (config.rc_file,) )
+        try:
+            results = pool.map(_batch_generate_code, tasks, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        _init_guiless_app()
+        results = [_batch_generate_code(task) for task in tasks]
+
+    failed = [filename for filename, success, duration in results if not success]
+    for filename, success, duration in results:
+        logging.info( _("%-6s %7.2fs  %s"), success and "OK" or "FAILED", duration, filename )
+    logging.info( _("Generated code for %d of %d files in %.2f seconds"),
+                  len(results)-len(failed), len(results), time.time()-start )
+    if config.testing:
+        return results
+    sys.exit(failed and 1 or 0)
+
+
 def init_stage1(options):
     """Initialise paths for wxGlade (first stage)
     Initialisation is split because the test suite doesn't work with proper initialised paths."""
@@ -373,17 +497,35 @@ def run_main():
     "This main procedure is started by calling either wxglade.py or wxglade.pyw on windows."
     # check command line parameters first
     options = parse_command_line()
+    if options.profile_startup:
+        profiling.startup.enable( os.path.abspath(options.profile_startup) )
 
     # initialise wxGlade (first stage and second stage)
-    init_stage1(options)
-    init_stage2(options.start_gui)
+    with profiling.startup.measure("init_stage1"):
+        init_stage1(options)
+    with profiling.startup.measure("init_stage2"):
+        init_stage2(options.start_gui)
+
+    if options.profile_codegen:
+        # the report is sorted by key to be comparable between runs
+        profiling.codegen.enable( os.path.abspath(options.profile_codegen) )
+        atexit.register(profiling.codegen.finish, True)
+        if options.jobs != 1:
+            logging.info( _("Option --profile-codegen: generating code in a single process") )
+            options.jobs = 1
 
     if options.start_gui:
         # late import of main (imported wx) for using wxversion  in init_stage2()
-        import main
-        main.main(options.filename)
+        with profiling.startup.measure("import main"):
+            import main
+        main.main(options.filename)  # writes the startup profiling report before entering the main loop
     else:
-        command_line_code_generation( filename=options.filename, language=options.language, out_path=options.output )
+        profiling.startup.finish()
+        if len(options.filenames) > 1:
+            command_line_batch_code_generation( options.filenames, options.language, options.jobs )
+        else:
+            command_line_code_generation( filename=options.filename, language=options.language,
+                                          out_path=options.output )
 
 if __name__ == "__main__":
     run_main()
@@ -10,12 +10,13 @@ See wcodegen.taghandler for custom tag handler base classes.
 """
 
 import logging
-from xml.sax import SAXException, make_parser
+from xml.parsers import expat
+from xml.sax import SAXException, SAXParseException, make_parser
 from xml.sax.handler import ContentHandler
 
 import time
 
-import common, config
+import common, config, plugins
 
 
 class XmlParsingError(SAXException):
@@ -28,6 +29,50 @@ class XmlParsingError(SAXException):
         SAXException.__init__(self, msg)
 
 
+class ExpatReader(object):
+    """Replacement for the SAX parser returned by xml.sax.make_parser(), implementing only the parts used by XmlParser.
+
+    The expat callbacks are connected directly to the handler methods, i.e. there's no SAX layer in between and
+    character data is buffered by expat instead of being passed in small fragments.
+    The instance is also the document locator. Parsing errors are raised as SAXParseException, like with SAX."""
+    CHUNK_SIZE = 2**16
+
+    def __init__(self, handler):
+        self._parser = parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = handler.startElement
+        parser.EndElementHandler = handler.endElement
+        parser.CharacterDataHandler = handler.characters
+        handler.setDocumentLocator(self)
+
+    def parse(self, source):
+        read = source.read
+        while True:
+            data = read(self.CHUNK_SIZE)
+            if not data: break
+            self.feed(data)
+        self.close()
+
+    def feed(self, data, is_final=False):
+        try:
+            self._parser.Parse(data, is_final)
+        except expat.ExpatError as inst:
+            raise SAXParseException( expat.ErrorString(inst.code), inst, self )
+
+    def close(self):
+        self.feed("", True)
+
+    # locator interface
+    def getColumnNumber(self):
+        return self._parser.CurrentColumnNumber
+    def getLineNumber(self):
+        return self._parser.CurrentLineNumber
+    def getPublicId(self):
+        return None
+    def getSystemId(self):
+        return None
+
+
 class XmlParser(ContentHandler):
     "'abstract' base class of the parsers used to load an app and to generate the code"
 
@@ -37,8 +82,11 @@ class XmlParser(ContentHandler):
         self._curr_prop_val = []     # Value of the current property; strings, to be joined
         self._appl_started = False
         self.top = self._objects.top
-        self.parser = make_parser()
-        self.parser.setContentHandler(self)
+        if config.xml_parser=="sax":
+            self.parser = make_parser()
+            self.parser.setContentHandler(self)
+        else:
+            self.parser = ExpatReader(self)
         self.locator = None # Document locator
         self.index = None     # only used with ClipboardXmlWidgetBuilder
 
@@ -182,6 +230,14 @@ class XmlWidgetBuilder(XmlParser):
         if not self.input_file_version: return True
         return self.input_file_version[:len(version)] < version
 
+    def parse(self, source):
+        with np.batched_changes():
+            XmlParser.parse(self, source)
+
+    def parse_string(self, source):
+        with np.batched_changes():
+            XmlParser.parse_string(self, source)
+
     def startElement(self, name, attrs):
         if name == 'application':
             # get properties of the app
@@ -237,7 +293,8 @@ class XmlWidgetBuilder(XmlParser):
             try:
                 # look for a custom handler to push on the stack
                 obj = self.top()
-                handler = obj.obj.get_property_handler(name)
+                get_property_handler = _get_property_handler_function(obj.obj)
+                handler = get_property_handler and get_property_handler(obj.obj, name)
                 if handler:
                     obj.prop_handlers.push(handler)
                 # get the top custom handler and use it if there's one
@@ -267,6 +324,9 @@ class XmlWidgetBuilder(XmlParser):
                 obj.obj.copy_properties( obj.sizeritem, ("option","flag","border","span") )
                 obj.obj.properties["flag"]._check_value()
             obj.obj.on_load()
+            if not self._objects:
+                # a toplevel object is complete; notify the owners of the modified properties now
+                np.flush_changes()
         else:
             # end of a property or error
             prop = self._curr_prop
@@ -293,7 +353,7 @@ class XmlWidgetBuilder(XmlParser):
                 #  if this returns True, remove the handler from Stack
                 obj = self.top()
                 handler = obj.prop_handlers.top()
-                if handler.end_elem(name):
+                if handler is not None and handler.end_elem(name):
                     obj.prop_handlers.pop()
             except AttributeError:
                 pass
@@ -323,7 +383,7 @@ class ProgressXmlWidgetBuilder(XmlWidgetBuilder):
         else:
             self.size = 0
             self.progress = None
-        XmlWidgetBuilder.__init__(self)
+        XmlWidgetBuilder.__init__(self, *args, **kwds)
 
     def endElement(self, name):
         if self.progress:
@@ -598,6 +658,8 @@ class XmlWidgetObject(object):
 
             # build the widget
             builder = common.widgets_from_xml.get(base, None)
+            if builder is None and plugins.load_widget_class(base):
+                builder = common.widgets_from_xml.get(base, None)
             if builder is None: raise XmlParsingError("Widget '%s' not supported."%base)
             
             self.obj = builder(parser, base, attrs["name"], sizer or parent, index)
@@ -661,7 +723,7 @@ class XmlWidgetObject(object):
             self.obj.properties["instance_class"].set( instance_class, activate=True )
             modified.append("instance_class")
         if modified:
-            self.obj.properties_changed(modified)
+            np.notify_changed(self.obj, modified)
 
     def add_property(self, name, val):
         """adds a property to this widget. This method is not called if there
@@ -683,11 +745,25 @@ class XmlWidgetObject(object):
     def notify_owner(self):
         # notify owner about the added properties
         if not self._properties_added: return
-        self.obj.properties_changed(self._properties_added)
+        np.notify_changed(self.obj, self._properties_added)
         del self._properties_added[:]
 
 
 
+_property_handler_functions = {}  # class -> get_property_handler function or None
+
+def _get_property_handler_function(obj):
+    """Return the get_property_handler function of the object's class, or None.
+    Most classes like sizers don't implement it; looking this up per class avoids raising AttributeError for
+    each of their properties."""
+    cls = obj.__class__
+    try:
+        return _property_handler_functions[cls]
+    except KeyError:
+        ret = _property_handler_functions[cls] = getattr(cls, "get_property_handler", None)
+        return ret
+
+
 class Stack(list):
     "Simple stack implementation"
     def push(self, elem):